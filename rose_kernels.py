@@ -0,0 +1,50 @@
+# rose_kernels.py
+# Numeric kernels for the HUD paint loop (waveform bars, petal motion).
+# Numba is optional: when it's installed the kernels compile to native code
+# on first call; without it the same functions run as plain NumPy.
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        # no-op decorator so the kernels still run as regular functions
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(fn):
+            return fn
+        return wrap
+
+# 1024-entry sine table; bar phases only need ~0.006 rad resolution, so
+# indexed loads replace three libm sin sweeps per frame
+_SIN_LUT = np.sin(np.linspace(0.0, 2.0 * np.pi, 1024, endpoint=False)).astype(np.float32)
+_LUT_SCALE = np.float32(1024.0 / (2.0 * np.pi))
+
+@njit(fastmath=True, cache=True)
+def _sin(x):
+    return _SIN_LUT[(x * _LUT_SCALE).astype(np.int32) & 1023]
+
+@njit(fastmath=True, cache=True)
+def wave_bars(wave_phase, grad_phase, bar_count, sensitivity, active):
+    """Return (amp, hue) arrays for the waveform bars at the given phases."""
+    i = np.arange(bar_count).astype(np.float32)
+    phases = wave_phase + i * 0.28
+    if active:
+        amp = 0.25 + 0.75 * (0.5 + 0.5 * _sin(phases * 1.6))
+        amp = amp * (0.8 + 0.6 * sensitivity)
+    else:
+        amp = 0.45 + 0.12 * _sin(phases * 0.9)
+    hue = (300.0 + 30.0 * _sin(phases + grad_phase)) % 360.0
+    return amp, hue
+
+@njit(fastmath=True, cache=True)
+def petal_step(x0, y0, dx, dy, start, end, now):
+    """Return (x, y, alpha, size) arrays for live petals at time `now`."""
+    prog = (now - start) / (end - start)
+    prog = np.minimum(np.maximum(prog, 0.0), 1.0)
+    x = x0 + dx * prog
+    y = y0 + dy * prog + prog ** 1.5 * 30.0
+    alpha = 255.0 * (1.0 - prog)
+    size = np.maximum(4.0, 6.0 * (1.0 - prog) + 3.0)
+    return x, y, alpha, size
@@ -1,426 +1,567 @@
-# rose_v25_neonhud.py
-# Polished Neon HUD v25:
-# - Smooth animations (open/close/minimize)
-# - Optimized gradient background
-# - Peach rose icon at top-left
-# - Custom waveform below title during TTS
-# - Edge-TTS + default system player
-# - YouTube autoplay via pytube Search
-# - Volume & basic system commands
-# - Always-listening voice input (SpeechRecognition)
-# - Fixed microphone & global TTS syntax issues
-
-import sys
-import os
-import math
-import time
-import asyncio
-import threading
-import webbrowser
-import platform
-import subprocess
-
-from PySide6.QtCore import Qt, QTimer, QPoint, QRect, QEasingCurve, QPropertyAnimation
-from PySide6.QtWidgets import QApplication, QWidget, QLabel, QPushButton
-from PySide6.QtGui import QFont, QPainter, QLinearGradient, QColor, QBrush, QPixmap
-
-import speech_recognition as sr
-import edge_tts
-from pytube import Search
-
-# -------------------- Globals --------------------
-LISTENING = True
-TTS_PLAYING = False
-TTS_LOCK = threading.Lock()
-
-# -------------------- TTS --------------------
-def _estimate_tts_duration_seconds(text: str) -> float:
-    words = len(text.split())
-    if words == 0:
-        return 0.8
-    return max(0.8, words / 2.8)
-
-def speak(text: str):
-    """Edge-TTS async + default player playback"""
-    def _run():
-        global TTS_PLAYING
-        with TTS_LOCK:
-            TTS_PLAYING = True
-        try:
-            async def gen_and_play():
-                communicate = edge_tts.Communicate(text, "en-US-JennyNeural")
-                await communicate.save("speech.mp3")
-            asyncio.run(gen_and_play())
-
-            if platform.system() == "Windows":
-                subprocess.Popen(["start", "speech.mp3"], shell=True)
-            elif platform.system() == "Darwin":
-                subprocess.Popen(["afplay", "speech.mp3"])
-            else:
-                subprocess.Popen(["xdg-open", "speech.mp3"])
-
-            dur = _estimate_tts_duration_seconds(text) + 0.6
-            time.sleep(dur)
-        except Exception as e:
-            print("TTS/playback error:", e)
-        finally:
-            with TTS_LOCK:
-                TTS_PLAYING = False
-
-    threading.Thread(target=_run, daemon=True).start()
-
-# -------------------- YouTube --------------------
-def play_youtube_song(song: str):
-    try:
-        query = song.strip()
-        if not query:
-            webbrowser.open("https://www.youtube.com")
-            return
-        search = Search(query)
-        if not search.results:
-            url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-            webbrowser.open(url)
-            return
-        first = search.results[0]
-        url = first.watch_url
-        webbrowser.open(url)
-    except Exception as e:
-        print("YouTube play error:", e)
-        url = f"https://www.youtube.com/results?search_query={song.replace(' ', '+')}"
-        webbrowser.open(url)
-
-# -------------------- Volume / System --------------------
-def adjust_volume(cmd: str):
-    try:
-        if platform.system() == "Windows":
-            if "up" in cmd: os.system("nircmd.exe changesysvolume 5000")
-            elif "down" in cmd: os.system("nircmd.exe changesysvolume -5000")
-            elif "mute" in cmd: os.system("nircmd.exe mutesysvolume 1")
-            elif "unmute" in cmd: os.system("nircmd.exe mutesysvolume 0")
-        elif platform.system() == "Darwin":
-            if "up" in cmd:
-                os.system("osascript -e 'set volume output volume (output volume of (get volume settings) + 10)'")
-            elif "down" in cmd:
-                os.system("osascript -e 'set volume output volume (output volume of (get volume settings) - 10)'")
-        else:
-            if "up" in cmd: os.system("amixer -D pulse sset Master 5%+")
-            elif "down" in cmd: os.system("amixer -D pulse sset Master 5%-")
-    except Exception as e:
-        print("Volume control error:", e)
-
-def system_action(cmd: str):
-    try:
-        if "shutdown" in cmd:
-            if platform.system() == "Windows": os.system("shutdown /s /t 1")
-            else: os.system("shutdown now")
-        elif "restart" in cmd:
-            if platform.system() == "Windows": os.system("shutdown /r /t 1")
-            else: os.system("reboot")
-    except Exception as e:
-        print("System action error:", e)
-
-# -------------------- Voice handler --------------------
-def handle_command(cmd: str, hud_ref):
-    cmd = cmd.lower().strip()
-    if not cmd: return
-    hud_ref.update_response(f"You said: {cmd}")
-
-    if cmd.startswith("play "):
-        song = cmd[5:].replace("on youtube", "").strip()
-        hud_ref.update_response(f"Playing {song} on YouTube...")
-        speak(f"Playing {song} on YouTube")
-        play_youtube_song(song)
-        return
-
-    if any(x in cmd for x in ["volume up","increase volume","volume higher"]):
-        adjust_volume("up")
-        speak("Volume increased")
-        hud_ref.update_response("Volume increased")
-        return
-    if any(x in cmd for x in ["volume down","decrease volume","volume lower"]):
-        adjust_volume("down")
-        speak("Volume decreased")
-        hud_ref.update_response("Volume decreased")
-        return
-    if "mute" in cmd and "unmute" not in cmd:
-        adjust_volume("mute")
-        speak("Muted")
-        hud_ref.update_response("Muted")
-        return
-    if "unmute" in cmd:
-        adjust_volume("unmute")
-        speak("Unmuted")
-        hud_ref.update_response("Unmuted")
-        return
-
-    if "shutdown" in cmd:
-        hud_ref.update_response("Shutting down...")
-        speak("Shutting down the system")
-        system_action("shutdown")
-        return
-    if "restart" in cmd:
-        hud_ref.update_response("Restarting...")
-        speak("Restarting the system")
-        system_action("restart")
-        return
-
-    if "notepad" in cmd:
-        hud_ref.update_response("Opening Notepad...")
-        speak("Opening Notepad")
-        if platform.system() == "Windows": subprocess.Popen(["notepad.exe"])
-        return
-    if "calculator" in cmd:
-        hud_ref.update_response("Opening Calculator...")
-        speak("Opening Calculator")
-        if platform.system() == "Windows": subprocess.Popen(["calc.exe"])
-        return
-
-    if any(x in cmd for x in ["hello","hi","hey"]):
-        speak("Hello. I'm Rose, your healer.")
-        hud_ref.update_response("Hello. I'm Rose, your healer.")
-        return
-
-    speak(f"I heard: {cmd}")
-    hud_ref.update_response(f"I heard: {cmd}")
-
-# -------------------- HUD --------------------
-class NeonHUD(QWidget):
-    def __init__(self):
-        super().__init__()
-
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.resize(520, 300)
-        self.setMinimumSize(360, 220)
-
-        self.icon_pix = self._build_peach_rose_icon(28)
-
-        self.title_label = QLabel("ROSE", self)
-        self.title_label.setFont(QFont("Segoe UI", 28, QFont.Bold))
-        self.title_label.setStyleSheet("color: white;")
-        self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setGeometry(0, 36, self.width(), 50)
-
-        self.response_label = QLabel("Hi, I'm Rose, your healer...", self)
-        self.response_label.setFont(QFont("Segoe UI", 14))
-        self.response_label.setStyleSheet("color: white;")
-        self.response_label.setAlignment(Qt.AlignCenter)
-        self.response_label.setWordWrap(True)
-        self.response_label.setGeometry(20, 120, self.width() - 40, 80)
-
-        self.close_btn = QPushButton(self)
-        self.close_btn.setStyleSheet("background-color: #FF5C5C; border-radius:7px;")
-        self.close_btn.setGeometry(10, 10, 16, 16)
-        self.close_btn.clicked.connect(self._animate_close)
-
-        self.min_btn = QPushButton(self)
-        self.min_btn.setStyleSheet("background-color: #FFBD44; border-radius:7px;")
-        self.min_btn.setGeometry(34, 10, 16, 16)
-        self.min_btn.clicked.connect(self._animate_minimize)
-
-        self.max_btn = QPushButton(self)
-        self.max_btn.setStyleSheet("background-color: #28C840; border-radius:7px;")
-        self.max_btn.setGeometry(58, 10, 16, 16)
-        self.max_btn.clicked.connect(self.toggle_max_restore)
-
-        self._drag_pos = None
-        self._fade_anim = None
-        self._geom_anim = None
-        self._grad_phase = 0.0
-        self._grad_timer = QTimer(self)
-        self._grad_timer.timeout.connect(self._on_grad_tick)
-        self._grad_timer.start(40)
-
-        self._wave_phase = 0.0
-        self._wave_timer = QTimer(self)
-        self._wave_timer.timeout.connect(self._on_wave_tick)
-        self._wave_timer.start(35)
-
-        threading.Thread(target=self._start_listening, daemon=True).start()
-        self.setWindowOpacity(0.0)
-        self._animate_show()
-
-    def _build_peach_rose_icon(self, size_px:int):
-        pix = QPixmap(size_px, size_px)
-        pix.fill(Qt.transparent)
-        p = QPainter(pix)
-        p.setRenderHint(QPainter.Antialiasing)
-        center = size_px/2
-        petal_color = QColor(255,179,153)
-        stroke = QColor(210,120,100)
-        p.setBrush(petal_color)
-        p.setPen(stroke)
-        for i in range(5):
-            angle = i*(360/5)
-            rad = math.radians(angle)
-            x = center + math.cos(rad)*(size_px*0.12)
-            y = center + math.sin(rad)*(size_px*0.12)
-            rect = QRect(int(x-size_px*0.22), int(y-size_px*0.22), int(size_px*0.44), int(size_px*0.44))
-            p.drawEllipse(rect)
-        p.setBrush(QColor(255,140,120))
-        p.drawEllipse(int(center-size_px*0.12), int(center-size_px*0.12), int(size_px*0.24), int(size_px*0.24))
-        p.end()
-        return pix
-
-    def update_response(self, text:str):
-        self.response_label.setText(text)
-
-    def _animate_show(self):
-        anim = QPropertyAnimation(self, b"windowOpacity")
-        anim.setDuration(420)
-        anim.setStartValue(0.0)
-        anim.setEndValue(1.0)
-        anim.setEasingCurve(QEasingCurve.InOutCubic)
-        anim.start()
-        self._fade_anim = anim
-
-    def _animate_close(self):
-        if self._fade_anim and self._fade_anim.state() == QPropertyAnimation.Running:
-            self._fade_anim.stop()
-        anim = QPropertyAnimation(self, b"windowOpacity")
-        anim.setDuration(350)
-        anim.setStartValue(self.windowOpacity())
-        anim.setEndValue(0.0)
-        anim.setEasingCurve(QEasingCurve.InOutCubic)
-        anim.finished.connect(self.close)
-        anim.start()
-        self._fade_anim = anim
-
-    def _animate_minimize(self):
-        anim = QPropertyAnimation(self, b"windowOpacity")
-        anim.setDuration(300)
-        anim.setStartValue(self.windowOpacity())
-        anim.setEndValue(0.0)
-        anim.setEasingCurve(QEasingCurve.InOutCubic)
-
-        def do_min():
-            self.showMinimized()
-            self.setWindowOpacity(0.0)
-
-        anim.finished.connect(do_min)
-        anim.start()
-        self._fade_anim = anim
-
-    def toggle_max_restore(self):
-        if self.isMaximized(): self.showNormal()
-        else: self.showMaximized()
-
-    def _on_grad_tick(self):
-        self._grad_phase += 0.008
-        if self._grad_phase > math.tau: self._grad_phase -= math.tau
-        self.update()
-
-    def _on_wave_tick(self):
-        self._wave_phase += 0.14
-        if self._wave_phase > math.tau: self._wave_phase -= math.tau
-        self.update(QRect(20, self.height()-70, self.width()-40, 48))
-
-    def paintEvent(self, ev):
-        global TTS_PLAYING
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        w,h = self.width(), self.height()
-        phase = self._grad_phase
-        c1_h = (270 + (math.sin(phase)*20)) %360
-        c2_h = (300 + (math.cos(phase*1.3)*18)) %360
-        c1 = QColor.fromHsv(int(c1_h),200,160)
-        c2 = QColor.fromHsv(int(c2_h),200,180)
-        grad = QLinearGradient(0,0,w,h)
-        grad.setColorAt(0.0, c1)
-        grad.setColorAt(1.0, c2)
-        painter.setBrush(QBrush(grad))
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(0,0,w,h,20,20)
-        painter.drawPixmap(90,6,self.icon_pix)
-        painter.setBrush(QColor(255,255,255,10))
-        painter.drawRoundedRect(10,10,w-20,h-20,18,18)
-        is_speaking=False
-        with TTS_LOCK: is_speaking=TTS_PLAYING
-        if is_speaking: self._draw_waveform(painter)
-
-        # Title glow
-        title_rect = self.title_label.geometry()
-        for i in range(4,0,-1):
-            alpha=int(30/i)
-            glow_color=QColor(255,255,255,alpha)
-            painter.setPen(glow_color)
-            painter.setFont(QFont("Segoe UI",28+i,QFont.Bold))
-            painter.drawText(title_rect,Qt.AlignCenter,self.title_label.text())
-        painter.setPen(QColor(255,255,255))
-        painter.setFont(QFont("Segoe UI",28,QFont.Bold))
-        painter.drawText(title_rect,Qt.AlignCenter,self.title_label.text())
-
-    def _draw_waveform(self, painter:QPainter):
-        bar_count=max(8,int(self.width()/28))
-        rect_w=self.width()-40
-        rect_h=48
-        x0=20
-        y0=self.height()-80
-        spacing=rect_w/bar_count
-        base_color=QColor(255,255,255,200)
-        for i in range(bar_count):
-            phase=self._wave_phase+(i*0.35)
-            h_ratio=0.2+0.8*(0.5+0.5*math.sin(phase))
-            bar_h=rect_h*h_ratio
-            bx=int(x0+i*spacing+spacing*0.15)
-            bw=int(spacing*0.7)
-            by=int(y0+(rect_h-bar_h)/2)
-            alpha=int(120+80*h_ratio)
-            col=QColor(base_color.red(),base_color.green(),base_color.blue(),alpha)
-            painter.setBrush(col)
-            painter.setPen(Qt.NoPen)
-            painter.drawRoundedRect(bx,by,bw,int(bar_h),6,6)
-
-    def _start_listening(self):
-        recognizer = sr.Recognizer()
-        mic = None
-        for i,name in enumerate(sr.Microphone.list_microphone_names()):
-            if "Microphone" in name or "Array" in name:
-                mic = sr.Microphone(device_index=i)
-                break
-        if mic is None:
-            mic = sr.Microphone()  # fallback
-        recognizer.dynamic_energy_threshold = True
-        recognizer.pause_threshold = 0.4
-        recognizer.operation_timeout = None
-        global LISTENING
-        while LISTENING:
-            try:
-                with mic as source:
-                    recognizer.adjust_for_ambient_noise(source,duration=0.5)
-                    audio = recognizer.listen(source, phrase_time_limit=5)
-                try:
-                    text = recognizer.recognize_google(audio)
-                    if text.strip(): handle_command(text,self)
-                except sr.UnknownValueError: continue
-                except sr.RequestError as e: print("Speech recognition error:",e)
-            except Exception as e:
-                print("Microphone/listen error:",e)
-                time.sleep(0.5)
-
-    def mousePressEvent(self, ev):
-        if ev.button() == Qt.LeftButton:
-            self._drag_pos=ev.globalPosition().toPoint()-self.frameGeometry().topLeft()
-            ev.accept()
-    def mouseMoveEvent(self, ev):
-        if self._drag_pos is not None and ev.buttons() & Qt.LeftButton:
-            self.move(ev.globalPosition().toPoint()-self._drag_pos)
-            ev.accept()
-    def mouseReleaseEvent(self, ev):
-        self._drag_pos=None
-        ev.accept()
-    def closeEvent(self, ev):
-        global LISTENING
-        LISTENING=False
-        time.sleep(0.2)
-        ev.accept()
-
-# -------------------- Main --------------------
-def main():
-    app = QApplication(sys.argv)
-    hud = NeonHUD()
-    hud.show()
-    sys.exit(app.exec())
-
-if __name__=="__main__":
-    main()
+# rose_v25_neonhud.py
+# Polished Neon HUD v25:
+# - Smooth animations (open/close/minimize)
+# - Optimized gradient background
+# - Peach rose icon at top-left
+# - Custom waveform below title during TTS
+# - Edge-TTS + default system player
+# - YouTube autoplay via pytube Search
+# - Volume & basic system commands
+# - Always-listening voice input (SpeechRecognition)
+# - Fixed microphone & global TTS syntax issues
+
+import sys
+import os
+import math
+import time
+import asyncio
+import threading
+import webbrowser
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from PySide6.QtCore import Qt, QTimer, QPoint, QRect, QEasingCurve, QPropertyAnimation
+from PySide6.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QGraphicsDropShadowEffect
+from PySide6.QtGui import QFont, QPainter, QLinearGradient, QColor, QBrush, QPixmap, QPainterPath, QImage, QMouseEvent
+
+import speech_recognition as sr
+import edge_tts
+from pytube import Search
+
+# -------------------- Globals --------------------
+# set while TTS audio is playing; Event reads are lock-free for the paint path
+TTS_EVENT = threading.Event()
+
+GRAD_CACHE_STEPS = 64  # quantized gradient phases kept as pre-rendered pixmaps
+
+# 1024-entry sine table; waveform phases index it instead of evaluating sin
+_SIN_LUT = np.sin(np.arange(1024) * (math.tau / 1024))
+_SIN_SCALE = 1024 / math.tau
+
+def fsin(x: float) -> float:
+    return _SIN_LUT[int(x * _SIN_SCALE) & 1023]
+
+# Qt5-compat globalPos() returns an int QPoint directly; mouse moves fire at
+# the pointer's report rate, so skip the QPointF round-trip when we can
+_HAS_GLOBALPOS = hasattr(QMouseEvent, "globalPos")
+
+# platform resolved once at import instead of platform.system() per call
+_WIN = sys.platform.startswith("win")
+_MAC = sys.platform == "darwin"
+
+if _WIN:
+    _VOL_CMDS = {
+        "up": "nircmd.exe changesysvolume 5000",
+        "down": "nircmd.exe changesysvolume -5000",
+        "mute": "nircmd.exe mutesysvolume 1",
+        "unmute": "nircmd.exe mutesysvolume 0",
+    }
+elif _MAC:
+    _VOL_CMDS = {
+        "up": "osascript -e 'set volume output volume (output volume of (get volume settings) + 10)'",
+        "down": "osascript -e 'set volume output volume (output volume of (get volume settings) - 10)'",
+    }
+else:
+    _VOL_CMDS = {
+        "up": "amixer -D pulse sset Master 5%+",
+        "down": "amixer -D pulse sset Master 5%-",
+    }
+
+# Windows: talk to Core Audio directly via pycaw (one COM call per command)
+# instead of spawning nircmd.exe; shell commands above stay as the fallback
+_VOLUME_ENDPOINT = None
+if _WIN:
+    try:
+        from ctypes import cast, POINTER
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        _iface = AudioUtilities.GetSpeakers().Activate(
+            IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        _VOLUME_ENDPOINT = cast(_iface, POINTER(IAudioEndpointVolume))
+    except Exception as e:
+        print("pycaw unavailable, falling back to nircmd:", e)
+
+# -------------------- TTS --------------------
+def _estimate_tts_duration_seconds(text: str) -> float:
+    words = len(text.split())
+    if words == 0:
+        return 0.8
+    return max(0.8, words / 2.8)
+
+def speak(text: str):
+    """Edge-TTS async + default player playback"""
+    def _run():
+        TTS_EVENT.set()
+        try:
+            async def gen_and_play():
+                communicate = edge_tts.Communicate(text, "en-US-JennyNeural")
+                await communicate.save("speech.mp3")
+            asyncio.run(gen_and_play())
+
+            if _WIN:
+                subprocess.Popen(["start", "speech.mp3"], shell=True)
+            elif _MAC:
+                subprocess.Popen(["afplay", "speech.mp3"])
+            else:
+                subprocess.Popen(["xdg-open", "speech.mp3"])
+
+            dur = _estimate_tts_duration_seconds(text) + 0.6
+            time.sleep(dur)
+        except Exception as e:
+            print("TTS/playback error:", e)
+        finally:
+            TTS_EVENT.clear()
+
+    threading.Thread(target=_run, daemon=True).start()
+
+# -------------------- YouTube --------------------
+# pytube Search does a network request + HTML parse, so it runs on a small
+# worker pool instead of the recognition thread; repeat queries hit the cache
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2)
+
+@lru_cache(maxsize=128)
+def _youtube_watch_url(query: str) -> str:
+    search = Search(query)
+    if not search.results:
+        return f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
+    return search.results[0].watch_url
+
+def _search_and_open(query: str):
+    try:
+        webbrowser.open(_youtube_watch_url(query))
+    except Exception as e:
+        print("YouTube play error:", e)
+        webbrowser.open(f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}")
+
+def play_youtube_song(song: str):
+    query = song.strip()
+    if not query:
+        webbrowser.open("https://www.youtube.com")
+        return
+    _SEARCH_POOL.submit(_search_and_open, query)
+
+# -------------------- Volume / System --------------------
+def adjust_volume(cmd: str):
+    try:
+        if _VOLUME_ENDPOINT is not None:
+            if cmd == "up":
+                cur = _VOLUME_ENDPOINT.GetMasterVolumeLevelScalar()
+                _VOLUME_ENDPOINT.SetMasterVolumeLevelScalar(min(1.0, cur + 0.1), None)
+            elif cmd == "down":
+                cur = _VOLUME_ENDPOINT.GetMasterVolumeLevelScalar()
+                _VOLUME_ENDPOINT.SetMasterVolumeLevelScalar(max(0.0, cur - 0.1), None)
+            elif cmd == "mute":
+                _VOLUME_ENDPOINT.SetMute(1, None)
+            elif cmd == "unmute":
+                _VOLUME_ENDPOINT.SetMute(0, None)
+            return
+        shell_cmd = _VOL_CMDS.get(cmd)
+        if shell_cmd: os.system(shell_cmd)
+    except Exception as e:
+        print("Volume control error:", e)
+
+def system_action(cmd: str):
+    try:
+        if "shutdown" in cmd:
+            os.system("shutdown /s /t 1" if _WIN else "shutdown now")
+        elif "restart" in cmd:
+            os.system("shutdown /r /t 1" if _WIN else "reboot")
+    except Exception as e:
+        print("System action error:", e)
+
+# -------------------- Voice handler --------------------
+# keyword -> (category, action); compiled once instead of re-scanning the
+# command with a chain of "x in cmd" checks on every utterance
+_KEYWORD_INTENTS = [
+    ("volume up", ("volume", "up")),
+    ("increase volume", ("volume", "up")),
+    ("volume higher", ("volume", "up")),
+    ("volume down", ("volume", "down")),
+    ("decrease volume", ("volume", "down")),
+    ("volume lower", ("volume", "down")),
+    ("unmute", ("volume", "unmute")),
+    ("mute", ("volume", "mute")),
+    ("shutdown", ("system", "shutdown")),
+    ("restart", ("system", "restart")),
+    ("notepad", ("app", "notepad")),
+    ("calculator", ("app", "calculator")),
+    ("hello", ("greet", "hello")),
+    ("hi", ("greet", "hello")),
+    ("hey", ("greet", "hello")),
+]
+
+try:
+    import ahocorasick
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _kw, _tag in _KEYWORD_INTENTS:
+        _KEYWORD_AUTOMATON.add_word(_kw, _tag)
+    _KEYWORD_AUTOMATON.make_automaton()
+    def _match_intents(cmd: str):
+        return {tag for _, tag in _KEYWORD_AUTOMATON.iter(cmd)}
+except ImportError:
+    _KEYWORD_AUTOMATON = None
+    def _match_intents(cmd: str):
+        return {tag for kw, tag in _KEYWORD_INTENTS if kw in cmd}
+
+# resolution order mirrors the old if-chain precedence
+_INTENT_PRECEDENCE = [
+    ("volume", "up"), ("volume", "down"), ("volume", "mute"), ("volume", "unmute"),
+    ("system", "shutdown"), ("system", "restart"),
+    ("app", "notepad"), ("app", "calculator"),
+    ("greet", "hello"),
+]
+
+def _do_volume(hud_ref, act):
+    adjust_volume(act)
+    msg = {"up": "Volume increased", "down": "Volume decreased",
+           "mute": "Muted", "unmute": "Unmuted"}[act]
+    speak(msg)
+    hud_ref.update_response(msg)
+
+def _do_system(hud_ref, act):
+    if act == "shutdown":
+        hud_ref.update_response("Shutting down...")
+        speak("Shutting down the system")
+    else:
+        hud_ref.update_response("Restarting...")
+        speak("Restarting the system")
+    system_action(act)
+
+def _do_app(hud_ref, act):
+    name = act.capitalize()
+    hud_ref.update_response(f"Opening {name}...")
+    speak(f"Opening {name}")
+    if _WIN:
+        subprocess.Popen([{"notepad": "notepad.exe", "calculator": "calc.exe"}[act]])
+
+def _do_greet(hud_ref, act):
+    speak("Hello. I'm Rose, your healer.")
+    hud_ref.update_response("Hello. I'm Rose, your healer.")
+
+_INTENT_DISPATCH = {
+    "volume": _do_volume,
+    "system": _do_system,
+    "app": _do_app,
+    "greet": _do_greet,
+}
+
+def handle_command(cmd: str, hud_ref):
+    cmd = cmd.lower().strip()
+    if not cmd: return
+    hud_ref.update_response(f"You said: {cmd}")
+
+    if cmd.startswith("play "):
+        song = cmd[5:].replace("on youtube", "").strip()
+        hud_ref.update_response(f"Playing {song} on YouTube...")
+        speak(f"Playing {song} on YouTube")
+        play_youtube_song(song)
+        return
+
+    matches = _match_intents(cmd)
+    if ("volume", "unmute") in matches:
+        matches.discard(("volume", "mute"))  # "unmute" always contains "mute"
+    for tag in _INTENT_PRECEDENCE:
+        if tag in matches:
+            cat, act = tag
+            _INTENT_DISPATCH[cat](hud_ref, act)
+            return
+
+    speak(f"I heard: {cmd}")
+    hud_ref.update_response(f"I heard: {cmd}")
+
+# -------------------- HUD --------------------
+class NeonHUD(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.resize(520, 300)
+        self.setMinimumSize(360, 220)
+
+        self.icon_pix = self._build_peach_rose_icon(28)
+
+        self.title_label = QLabel("ROSE", self)
+        self.title_label.setFont(QFont("Segoe UI", 28, QFont.Bold))
+        self.title_label.setStyleSheet("color: white;")
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.title_label.setGeometry(0, 36, self.width(), 50)
+        # Qt caches the blurred glyph pixmap, replacing the old 4-pass glow draw
+        glow = QGraphicsDropShadowEffect(self)
+        glow.setBlurRadius(12)
+        glow.setColor(QColor(255, 255, 255, 120))
+        glow.setOffset(0, 0)
+        self.title_label.setGraphicsEffect(glow)
+
+        self.response_label = QLabel("Hi, I'm Rose, your healer...", self)
+        self.response_label.setFont(QFont("Segoe UI", 14))
+        self.response_label.setStyleSheet("color: white;")
+        self.response_label.setAlignment(Qt.AlignCenter)
+        self.response_label.setWordWrap(True)
+        self.response_label.setGeometry(20, 120, self.width() - 40, 80)
+
+        self.close_btn = QPushButton(self)
+        self.close_btn.setStyleSheet("background-color: #FF5C5C; border-radius:7px;")
+        self.close_btn.setGeometry(10, 10, 16, 16)
+        self.close_btn.clicked.connect(self._animate_close)
+
+        self.min_btn = QPushButton(self)
+        self.min_btn.setStyleSheet("background-color: #FFBD44; border-radius:7px;")
+        self.min_btn.setGeometry(34, 10, 16, 16)
+        self.min_btn.clicked.connect(self._animate_minimize)
+
+        self.max_btn = QPushButton(self)
+        self.max_btn.setStyleSheet("background-color: #28C840; border-radius:7px;")
+        self.max_btn.setGeometry(58, 10, 16, 16)
+        self.max_btn.clicked.connect(self.toggle_max_restore)
+
+        self._drag_pos = None
+        # one parented animation object reused for show/close/minimize fades
+        self._opacity_anim = QPropertyAnimation(self, b"windowOpacity", self)
+        self._opacity_anim.setEasingCurve(QEasingCurve.InOutCubic)
+        self._opacity_anim.finished.connect(self._on_fade_finished)
+        self._pending_action = None
+        self._geom_anim = None
+        self._grad_phase = 0.0
+        self._grad_cache = [None] * GRAD_CACHE_STEPS  # filled lazily per quantized phase
+        self._banner_pix = self._build_banner_pix()
+        self._rebuild_wave_geometry()
+        self._grad_timer = QTimer(self)
+        self._grad_timer.timeout.connect(self._on_grad_tick)
+        self._grad_timer.start(100)  # ~10 FPS is plenty for the slow hue drift
+
+        self._wave_phase = 0.0
+        self._wave_timer = QTimer(self)
+        self._wave_timer.timeout.connect(self._on_wave_tick)
+        # started on demand from _on_grad_tick while TTS is playing
+
+        self._stop_event = threading.Event()
+        threading.Thread(target=self._start_listening, daemon=True).start()
+        self.setWindowOpacity(0.0)
+        self._animate_show()
+
+    def _build_peach_rose_icon(self, size_px:int):
+        pix = QPixmap(size_px, size_px)
+        pix.fill(Qt.transparent)
+        p = QPainter(pix)
+        p.setRenderHint(QPainter.Antialiasing)
+        center = size_px/2
+        petal_color = QColor(255,179,153)
+        stroke = QColor(210,120,100)
+        p.setBrush(petal_color)
+        p.setPen(stroke)
+        for i in range(5):
+            angle = i*(360/5)
+            rad = math.radians(angle)
+            x = center + math.cos(rad)*(size_px*0.12)
+            y = center + math.sin(rad)*(size_px*0.12)
+            rect = QRect(int(x-size_px*0.22), int(y-size_px*0.22), int(size_px*0.44), int(size_px*0.44))
+            p.drawEllipse(rect)
+        p.setBrush(QColor(255,140,120))
+        p.drawEllipse(int(center-size_px*0.12), int(center-size_px*0.12), int(size_px*0.24), int(size_px*0.24))
+        p.end()
+        return pix
+
+    def update_response(self, text:str):
+        self.response_label.setText(text)
+
+    def _start_fade(self, duration, start, end, action):
+        if self._opacity_anim.state() == QPropertyAnimation.Running:
+            self._opacity_anim.stop()
+        self._pending_action = action
+        self._opacity_anim.setDuration(duration)
+        self._opacity_anim.setStartValue(start)
+        self._opacity_anim.setEndValue(end)
+        self._opacity_anim.start()
+
+    def _on_fade_finished(self):
+        action, self._pending_action = self._pending_action, None
+        if action == "close":
+            self.close()
+        elif action == "minimize":
+            self.showMinimized()
+            self.setWindowOpacity(0.0)
+
+    def _animate_show(self):
+        self._start_fade(420, 0.0, 1.0, None)
+
+    def _animate_close(self):
+        self._start_fade(350, self.windowOpacity(), 0.0, "close")
+
+    def _animate_minimize(self):
+        self._start_fade(300, self.windowOpacity(), 0.0, "minimize")
+
+    def toggle_max_restore(self):
+        if self.isMaximized(): self.showNormal()
+        else: self.showMaximized()
+
+    def _on_grad_tick(self):
+        if not self.isVisible(): return
+        # wave timer only needs to run while the waveform is visible (TTS active);
+        # this tick is on the GUI thread so toggling the timer here is safe
+        is_speaking = TTS_EVENT.is_set()
+        if is_speaking and not self._wave_timer.isActive():
+            self._wave_timer.start(35)
+        elif not is_speaking and self._wave_timer.isActive():
+            self._wave_timer.stop()
+        self._grad_phase += 0.008
+        if self._grad_phase > math.tau: self._grad_phase -= math.tau
+        self.update()
+
+    def _on_wave_tick(self):
+        if not self.isVisible(): return
+        self._wave_phase += 0.14
+        if self._wave_phase > math.tau: self._wave_phase -= math.tau
+        self.update(QRect(20, self.height()-70, self.width()-40, 48))
+
+    def showEvent(self, ev):
+        self._grad_timer.start(100)
+        super().showEvent(ev)
+
+    def hideEvent(self, ev):
+        self._grad_timer.stop()
+        self._wave_timer.stop()
+        super().hideEvent(ev)
+
+    def _gradient_pixmap(self, phase):
+        """Render the rounded gradient background for one phase into a pixmap.
+
+        Rendered via a premultiplied-alpha QImage so the raster engine can
+        composite the cached blit with its SSE2 fast path.
+        """
+        w,h = self.width(), self.height()
+        img = QImage(w, h, QImage.Format_ARGB32_Premultiplied)
+        img.fill(Qt.transparent)
+        p = QPainter(img)
+        p.setRenderHint(QPainter.Antialiasing)
+        c1_h = (270 + (fsin(phase)*20)) %360
+        c2_h = (300 + (fsin(phase*1.3 + math.tau/4)*18)) %360  # cos via quarter-turn
+        c1 = QColor.fromHsv(int(c1_h),200,160)
+        c2 = QColor.fromHsv(int(c2_h),200,180)
+        grad = QLinearGradient(0,0,w,h)
+        grad.setColorAt(0.0, c1)
+        grad.setColorAt(1.0, c2)
+        p.setBrush(QBrush(grad))
+        p.setPen(Qt.NoPen)
+        p.drawRoundedRect(0,0,w,h,20,20)
+        p.setBrush(QColor(255,255,255,10))
+        p.drawRoundedRect(10,10,w-20,h-20,18,18)
+        p.end()
+        return QPixmap.fromImage(img, Qt.NoFormatConversion)
+
+    def _build_banner_pix(self):
+        """Compose the static top-bar chrome (rose icon) into one pixmap.
+
+        The title itself is a QLabel with a cached drop-shadow glow, so the
+        banner no longer needs to pre-render text.
+        """
+        pix = QPixmap(self.width(), 90)
+        pix.fill(Qt.transparent)
+        p = QPainter(pix)
+        p.drawPixmap(90, 6, self.icon_pix)
+        p.end()
+        return pix
+
+    def resizeEvent(self, ev):
+        self._grad_cache = [None] * GRAD_CACHE_STEPS
+        self.title_label.setGeometry(0, 36, self.width(), 50)
+        self._banner_pix = self._build_banner_pix()
+        self._rebuild_wave_geometry()
+        super().resizeEvent(ev)
+
+    def paintEvent(self, ev):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        idx = int(self._grad_phase/math.tau*GRAD_CACHE_STEPS) % GRAD_CACHE_STEPS
+        if self._grad_cache[idx] is None:
+            self._grad_cache[idx] = self._gradient_pixmap(idx/GRAD_CACHE_STEPS*math.tau)
+        painter.drawPixmap(0,0,self._grad_cache[idx])
+        painter.drawPixmap(0,0,self._banner_pix)
+        if TTS_EVENT.is_set(): self._draw_waveform(painter)
+
+    def _rebuild_wave_geometry(self):
+        """Precompute per-bar x positions and phase offsets for the current size."""
+        bar_count=max(8,int(self.width()/28))
+        rect_w=self.width()-40
+        spacing=rect_w/bar_count
+        self._wave_spacing=spacing
+        self._wave_x=np.arange(bar_count)*spacing + 20 + spacing*0.15
+        self._wave_phases=np.arange(bar_count)*0.35
+
+    def _draw_waveform(self, painter:QPainter):
+        rect_h=48
+        y0=self.height()-80
+        spacing=self._wave_spacing
+        idx=((self._wave_phase+self._wave_phases)*_SIN_SCALE).astype(np.intp) & 1023
+        h_ratio=0.2+0.8*(0.5+0.5*_SIN_LUT[idx])
+        bar_h=rect_h*h_ratio
+        by=y0+(rect_h-bar_h)/2
+        bw=int(spacing*0.7)
+        path=QPainterPath()
+        for bx,y,bh in zip(self._wave_x,by,bar_h):
+            path.addRoundedRect(int(bx),int(y),bw,int(bh),6,6)
+        alpha=int(120+80*float(h_ratio.mean()))
+        painter.fillPath(path,QColor(255,255,255,alpha))
+
+    def _start_listening(self):
+        recognizer = sr.Recognizer()
+        mic = None
+        for i,name in enumerate(sr.Microphone.list_microphone_names()):
+            if "Microphone" in name or "Array" in name:
+                mic = sr.Microphone(device_index=i)
+                break
+        if mic is None:
+            mic = sr.Microphone()  # fallback
+        recognizer.dynamic_energy_threshold = True
+        recognizer.pause_threshold = 0.4
+        recognizer.operation_timeout = None
+        while not self._stop_event.is_set():
+            try:
+                # hold the PortAudio stream open across utterances; re-opening
+                # it per listen cost tens of ms and re-ran ambient calibration
+                with mic as source:
+                    recognizer.adjust_for_ambient_noise(source,duration=0.5)
+                    while not self._stop_event.is_set():
+                        try:
+                            audio = recognizer.listen(source, timeout=2, phrase_time_limit=5)
+                        except sr.WaitTimeoutError:
+                            continue  # periodic wakeup so shutdown is noticed promptly
+                        try:
+                            text = recognizer.recognize_google(audio)
+                            if text.strip(): handle_command(text,self)
+                        except sr.UnknownValueError: continue
+                        except sr.RequestError as e: print("Speech recognition error:",e)
+            except Exception as e:
+                print("Microphone/listen error:",e)
+                self._stop_event.wait(0.5)
+
+    def mousePressEvent(self, ev):
+        if ev.button() == Qt.LeftButton:
+            gp = ev.globalPos() if _HAS_GLOBALPOS else ev.globalPosition().toPoint()
+            self._drag_pos = gp - self.frameGeometry().topLeft()
+            ev.accept()
+    def mouseMoveEvent(self, ev):
+        if self._drag_pos is not None and ev.buttons() & Qt.LeftButton:
+            gp = ev.globalPos() if _HAS_GLOBALPOS else ev.globalPosition().toPoint()
+            self.move(gp - self._drag_pos)
+            ev.accept()
+    def mouseReleaseEvent(self, ev):
+        self._drag_pos=None
+        ev.accept()
+    def closeEvent(self, ev):
+        # signal the daemon recognizer thread; no blocking sleep on the GUI thread
+        self._stop_event.set()
+        ev.accept()
+
+# -------------------- Main --------------------
+def main():
+    app = QApplication(sys.argv)
+    hud = NeonHUD()
+    hud.show()
+    sys.exit(app.exec())
+
+if __name__=="__main__":
+    main()
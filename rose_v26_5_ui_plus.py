@@ -1,968 +1,1588 @@
-# rose_v26_5_ui_plus.py
-# Rose v26.5+ — UI + settings + mic reselect + optional Spotify Web API (fallback: media keys)
-# Requirements:
-#   pip install PySide6 speechrecognition edge-tts pytube
-# Optional:
-#   pip install spotipy
-
-import sys
-import os
-import math
-import time
-import asyncio
-import threading
-import webbrowser
-import platform
-import subprocess
-import random
-from typing import Optional, List
-
-from PySide6.QtCore import Qt, QTimer, QRect, QEasingCurve, QPropertyAnimation, QPoint
-from PySide6.QtWidgets import (
-    QApplication, QWidget, QLabel, QPushButton, QGraphicsDropShadowEffect,
-    QDialog, QVBoxLayout, QHBoxLayout, QSlider, QComboBox, QFormLayout, QLineEdit, QMessageBox, QCheckBox
-)
-from PySide6.QtGui import QFont, QPainter, QLinearGradient, QColor, QBrush, QPixmap, QPainterPath, QPaintEvent
-
-import speech_recognition as sr
-import edge_tts
-from pytube import Search
-
-# Try optional spotify web api
-SPOTIFY_AVAILABLE = False
-try:
-    import spotipy
-    from spotipy.oauth2 import SpotifyOAuth
-    SPOTIFY_AVAILABLE = True
-except Exception:
-    SPOTIFY_AVAILABLE = False
-
-# --------------- Globals ---------------
-LISTENING = True
-TTS_PLAYING = False
-TTS_LOCK = threading.Lock()
-BG_LISTENER_STOP = None
-HUD_REF: Optional["NeonHUD"] = None
-
-# HUD sizing/docking
-DEFAULT_WIDTH = 540
-DEFAULT_HEIGHT = 320
-MIN_WIDTH = 380
-MIN_HEIGHT = 220
-DOCK_THRESHOLD = 36
-
-# ---------------- Helpers ----------------
-def estimate_tts_duration(text: str) -> float:
-    words = len(text.split())
-    return max(0.5, words / 2.8)
-
-def _play_file_nonblocking(path: str):
-    try:
-        if platform.system() == "Windows":
-            subprocess.Popen(["start", path], shell=True)
-        elif platform.system() == "Darwin":
-            subprocess.Popen(["afplay", path])
-        else:
-            subprocess.Popen(["xdg-open", path])
-    except Exception as e:
-        print("Playback error:", e)
-
-# ---------------- TTS ----------------
-async def _edge_save(text: str, filename: str = "speech.mp3"):
-    comm = edge_tts.Communicate(text, "en-US-JennyNeural")
-    await comm.save(filename)
-
-def speak(text: str):
-    """Generate TTS and play it. Triggers HUD visual effects if HUD_REF is set."""
-    def runner():
-        global TTS_PLAYING, HUD_REF
-        # ask HUD to spawn petals right before voice
-        try:
-            if HUD_REF:
-                QTimer.singleShot(0, lambda: HUD_REF._trigger_speaking_effects(text))
-        except Exception:
-            pass
-
-        with TTS_LOCK:
-            TTS_PLAYING = True
-        try:
-            asyncio.run(_edge_save(text, "speech.mp3"))
-            _play_file_nonblocking("speech.mp3")
-            time.sleep(estimate_tts_duration(text) + 0.35)
-        except Exception as e:
-            print("TTS error:", e)
-        finally:
-            with TTS_LOCK:
-                TTS_PLAYING = False
-    threading.Thread(target=runner, daemon=True).start()
-
-# ---------------- YouTube ----------------
-def play_youtube_song(song: str):
-    try:
-        q = song.strip()
-        if not q:
-            webbrowser.open("https://www.youtube.com")
-            return
-        s = Search(q)
-        if not getattr(s, "results", None):
-            webbrowser.open(f"https://www.youtube.com/results?search_query={q.replace(' ','+')}")
-            return
-        first = s.results[0]
-        url = getattr(first, "watch_url", None) or f"https://www.youtube.com/watch?v={first.video_id}"
-        webbrowser.open(url)
-    except Exception as e:
-        print("YT error", e)
-        webbrowser.open(f"https://www.youtube.com/results?search_query={song.replace(' ','+')}")
-
-# ---------------- Spotify control (two modes) ----------------
-def _send_media_key_windows(vk_code: int):
-    try:
-        import ctypes
-        from ctypes import wintypes
-        user32 = ctypes.WinDLL('user32', use_last_error=True)
-        INPUT_KEYBOARD = 1
-        KEYEVENTF_EXTENDEDKEY = 0x0001
-        KEYEVENTF_KEYUP = 0x0002
-
-        class KEYBDINPUT(ctypes.Structure):
-            _fields_ = (("wVk", wintypes.WORD),
-                        ("wScan", wintypes.WORD),
-                        ("dwFlags", wintypes.DWORD),
-                        ("time", wintypes.DWORD),
-                        ("dwExtraInfo", wintypes.ULONG_PTR))
-
-        class INPUT(ctypes.Structure):
-            _fields_ = (("type", wintypes.DWORD),
-                        ("ki", KEYBDINPUT))
-
-        ki = KEYBDINPUT(wVk=vk_code, wScan=0, dwFlags=KEYEVENTF_EXTENDEDKEY, time=0, dwExtraInfo=0)
-        x = INPUT(type=INPUT_KEYBOARD, ki=ki)
-        user32.SendInput(1, ctypes.byref(x), ctypes.sizeof(x))
-
-        ki_up = KEYBDINPUT(wVk=vk_code, wScan=0, dwFlags=KEYEVENTF_EXTENDEDKEY | KEYEVENTF_KEYUP, time=0, dwExtraInfo=0)
-        x_up = INPUT(type=INPUT_KEYBOARD, ki=ki_up)
-        user32.SendInput(1, ctypes.byref(x_up), ctypes.sizeof(x_up))
-    except Exception as e:
-        print("Media key send failed:", e)
-
-def spotify_media_play_pause():
-    try:
-        if platform.system() == "Windows":
-            _send_media_key_windows(0xB3)
-        elif platform.system() == "Darwin":
-            subprocess.Popen(["osascript", "-e", 'tell application "Spotify" to playpause'])
-        else:
-            os.system("playerctl play-pause")
-    except Exception as e:
-        print("Spotify local play/pause error:", e)
-
-def spotify_media_next():
-    try:
-        if platform.system() == "Windows":
-            _send_media_key_windows(0xB0)
-        elif platform.system() == "Darwin":
-            subprocess.Popen(["osascript", "-e", 'tell application "Spotify" to next track'])
-        else:
-            os.system("playerctl next")
-    except Exception as e:
-        print("Spotify next error:", e)
-
-def spotify_media_prev():
-    try:
-        if platform.system() == "Windows":
-            _send_media_key_windows(0xB1)
-        elif platform.system() == "Darwin":
-            subprocess.Popen(["osascript", "-e", 'tell application "Spotify" to previous track'])
-        else:
-            os.system("playerctl previous")
-    except Exception as e:
-        print("Spotify prev error:", e)
-
-# Optional Spotify Web API wrapper (if spotipy present and env vars set)
-SPOTIFY_OAUTH = None
-SP_CLIENT = None
-if SPOTIFY_AVAILABLE:
-    try:
-        client_id = os.getenv("SPOTIPY_CLIENT_ID", "")
-        client_secret = os.getenv("SPOTIPY_CLIENT_SECRET", "")
-        redirect = os.getenv("SPOTIPY_REDIRECT_URI", "http://localhost:8888/callback")
-        if client_id and client_secret:
-            SPOTIFY_OAUTH = SpotifyOAuth(client_id=client_id, client_secret=client_secret, redirect_uri=redirect, scope="user-modify-playback-state,user-read-playback-state,user-read-currently-playing")
-            SP_CLIENT = spotipy.Spotify(auth_manager=SPOTIFY_OAUTH)
-            print("Spotify Web API initialized.")
-        else:
-            SPOTIFY_AVAILABLE = False
-    except Exception as e:
-        print("Spotify Web init error:", e)
-        SPOTIFY_AVAILABLE = False
-
-def spotify_web_play_search_and_play(query: str):
-    """Search using Spotify Web API and play on active device if possible."""
-    if not SPOTIFY_AVAILABLE or SP_CLIENT is None:
-        print("Spotify Web API not configured.")
-        return False
-    try:
-        result = SP_CLIENT.search(q=query, type="track", limit=1)
-        items = result.get("tracks", {}).get("items", [])
-        if not items:
-            return False
-        uri = items[0]["uri"]
-        # try to start playback on user's active device
-        SP_CLIENT.start_playback(uris=[uri])
-        return True
-    except Exception as e:
-        print("Spotify Web play error:", e)
-        return False
-
-# --------------- Volume & system ---------------
-def adjust_volume(cmd: str):
-    try:
-        if platform.system() == "Windows":
-            if "up" in cmd: os.system("nircmd.exe changesysvolume 5000")
-            elif "down" in cmd: os.system("nircmd.exe changesysvolume -5000")
-            elif "mute" in cmd: os.system("nircmd.exe mutesysvolume 1")
-            elif "unmute" in cmd: os.system("nircmd.exe mutesysvolume 0")
-        elif platform.system() == "Darwin":
-            if "up" in cmd: os.system("osascript -e 'set volume output volume (output volume of (get volume settings) + 10)'")
-            elif "down" in cmd: os.system("osascript -e 'set volume output volume (output volume of (get volume settings) - 10)'")
-        else:
-            if "up" in cmd: os.system("amixer -D pulse sset Master 5%+")
-            elif "down" in cmd: os.system("amixer -D pulse sset Master 5%-")
-    except Exception as e:
-        print("Volume control error:", e)
-
-def system_action(cmd: str):
-    try:
-        if "shutdown" in cmd:
-            if platform.system() == "Windows": os.system("shutdown /s /t 1")
-            else: os.system("shutdown now")
-        elif "restart" in cmd:
-            if platform.system() == "Windows": os.system("shutdown /r /t 1")
-            else: os.system("reboot")
-    except Exception as e:
-        print("System action error:", e)
-
-# ---------------- Command processor ----------------
-def handle_command(cmd: str, hud_ref: Optional["NeonHUD"] = None):
-    if not cmd:
-        return
-    cmd_norm = cmd.lower().strip()
-    if hud_ref:
-        hud_ref.update_response(f"You said: {cmd_norm}")
-
-    # Spotify voice commands (prefer web API if available & configured)
-    if "spotify" in cmd_norm:
-        # play/pause
-        if any(x in cmd_norm for x in ("play", "pause", "toggle", "play/pause")):
-            # try web API if configured
-            if SPOTIFY_AVAILABLE and SP_CLIENT:
-                # try searching for specific play request: "play <song> on spotify"
-                # if song specified, search then play; else toggle
-                if cmd_norm.startswith("play ") and "spotify" in cmd_norm:
-                    q = cmd_norm.replace("play", "").replace("spotify", "").strip()
-                    if q:
-                        ok = spotify_web_play_search_and_play(q)
-                        if ok:
-                            speak(f"Playing {q} on Spotify")
-                            return
-                # fallback to toggle
-            spotify_media_play_pause()
-            speak("Toggling Spotify")
-            return
-        if any(x in cmd_norm for x in ("next", "skip")):
-            spotify_media_next(); speak("Next track"); return
-        if any(x in cmd_norm for x in ("previous", "prev", "back")):
-            spotify_media_prev(); speak("Previous track"); return
-
-    # Play on YouTube (default for "play <song>")
-    if cmd_norm.startswith("play "):
-        if "spotify" in cmd_norm:
-            # handled above
-            pass
-        else:
-            song = cmd_norm.replace("play", "", 1).replace("on youtube", "").replace("youtube", "").strip()
-            if song:
-                if hud_ref: hud_ref.update_response(f"Playing {song} on YouTube...")
-                speak(f"Playing {song} on YouTube")
-                play_youtube_song(song)
-                return
-
-    # Volume
-    if any(x in cmd_norm for x in ("volume up", "increase volume", "higher volume")):
-        adjust_volume("up"); speak("Volume increased")
-        if hud_ref: hud_ref.update_response("Volume increased"); return
-    if any(x in cmd_norm for x in ("volume down", "decrease volume", "lower volume")):
-        adjust_volume("down"); speak("Volume decreased")
-        if hud_ref: hud_ref.update_response("Volume decreased"); return
-    if "mute" in cmd_norm and "unmute" not in cmd_norm:
-        adjust_volume("mute"); speak("Muted")
-        if hud_ref: hud_ref.update_response("Muted"); return
-    if "unmute" in cmd_norm:
-        adjust_volume("unmute"); speak("Unmuted")
-        if hud_ref: hud_ref.update_response("Unmuted"); return
-
-    # System
-    if "shutdown" in cmd_norm:
-        if hud_ref: hud_ref.update_response("Shutting down...")
-        speak("Shutting down the system"); system_action("shutdown"); return
-    if "restart" in cmd_norm:
-        if hud_ref: hud_ref.update_response("Restarting...")
-        speak("Restarting the system"); system_action("restart"); return
-
-    # Open apps
-    if "open chrome" in cmd_norm or "open brave" in cmd_norm or "open browser" in cmd_norm:
-        speak("Opening browser")
-        if platform.system() == "Windows":
-            brave = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
-            chrome = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-            if os.path.exists(brave): subprocess.Popen([brave])
-            elif os.path.exists(chrome): subprocess.Popen([chrome])
-            else: webbrowser.open("https://www.google.com")
-        else:
-            webbrowser.open("https://www.google.com")
-        return
-    if "open vscode" in cmd_norm or "open code" in cmd_norm:
-        speak("Opening Visual Studio Code")
-        code_path = rf"C:\Users\{os.getlogin()}\AppData\Local\Programs\Microsoft VS Code\Code.exe"
-        if platform.system() == "Windows" and os.path.exists(code_path):
-            subprocess.Popen([code_path])
-        else:
-            webbrowser.open("https://code.visualstudio.com")
-        return
-
-    # Greetings
-    if any(g in cmd_norm for g in ("hello", "hi", "hey")):
-        speak("Hello. I'm Rose, your healer.")
-        if hud_ref: hud_ref.update_response("Hello. I'm Rose, your healer.")
-        return
-
-    # Fallback
-    speak(f"I heard: {cmd_norm}")
-    if hud_ref: hud_ref.update_response(f"I heard: {cmd_norm}")
-
-# ---------------- Settings dialog ----------------
-class SettingsDialog(QDialog):
-    def __init__(self, parent: "NeonHUD"):
-        super().__init__(parent)
-        self.setWindowTitle("Rose Settings")
-        self.setModal(True)
-        self.parent = parent
-        self.setMinimumWidth(420)
-        layout = QVBoxLayout()
-
-        form = QFormLayout()
-
-        # theme intensity slider (0..100)
-        self.theme_slider = QSlider(Qt.Horizontal)
-        self.theme_slider.setRange(0, 100)
-        self.theme_slider.setValue(int(parent.theme_intensity * 100))
-        form.addRow("Theme intensity", self.theme_slider)
-
-        # waveform sensitivity
-        self.wave_slider = QSlider(Qt.Horizontal)
-        self.wave_slider.setRange(1, 200)
-        self.wave_slider.setValue(int(parent.waveform_sensitivity * 100))
-        form.addRow("Waveform sensitivity", self.wave_slider)
-
-        # mic device selector
-        self.mic_combo = QComboBox()
-        mics = sr.Microphone.list_microphone_names()
-        self.mic_combo.addItem("Auto-detect")
-        for m in mics:
-            self.mic_combo.addItem(m)
-        # select current
-        if parent.forced_mic_index is None:
-            self.mic_combo.setCurrentIndex(0)
-        else:
-            idx = parent.forced_mic_index + 1
-            if idx < self.mic_combo.count():
-                self.mic_combo.setCurrentIndex(idx)
-        form.addRow("Microphone override", self.mic_combo)
-
-        # spotify web toggle
-        self.spotify_checkbox = QCheckBox("Enable Spotify Web API (requires env vars)")
-        self.spotify_checkbox.setChecked(bool(SPOTIFY_AVAILABLE and SP_CLIENT))
-        form.addRow(self.spotify_checkbox)
-
-        layout.addLayout(form)
-
-        btns = QHBoxLayout()
-        save_btn = QPushButton("Save")
-        cancel_btn = QPushButton("Cancel")
-        save_btn.clicked.connect(self.on_save)
-        cancel_btn.clicked.connect(self.reject)
-        btns.addWidget(save_btn)
-        btns.addWidget(cancel_btn)
-        layout.addLayout(btns)
-        self.setLayout(layout)
-
-    def on_save(self):
-        # theme intensity
-        val = self.theme_slider.value()
-        self.parent.theme_intensity = val / 100.0
-        self.parent.waveform_sensitivity = self.wave_slider.value() / 100.0
-        # mic override
-        idx = self.mic_combo.currentIndex()
-        if idx == 0:
-            self.parent.forced_mic_index = None
-        else:
-            self.parent.forced_mic_index = idx - 1
-        # spotify web toggle - user must have env vars
-        # just notify user; actual SP_CLIENT config is global
-        if self.spotify_checkbox.isChecked() and not SPOTIFY_AVAILABLE:
-            QMessageBox.information(self, "Spotify", "Spotify Web API not configured or spotipy not installed.")
-        self.accept()
-
-# ---------------- NeonHUD ----------------
-class NeonHUD(QWidget):
-    def __init__(self):
-        super().__init__()
-        global HUD_REF
-        HUD_REF = self
-
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.resize(DEFAULT_WIDTH, DEFAULT_HEIGHT)
-        self.setMinimumSize(MIN_WIDTH, MIN_HEIGHT)
-
-        # visual params
-        self.theme_intensity = 0.9   # 0..1
-        self.waveform_sensitivity = 1.0
-        self.forced_mic_index: Optional[int] = None
-
-        # title & response
-        self.title_label = QLabel("ROSE", self)
-        self.title_label.setFont(QFont("Montserrat", 30, QFont.Bold))
-        self.title_label.setStyleSheet("color: white;")
-        self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setGeometry(0, 40, self.width(), 54)
-
-        self.response_label = QLabel("", self)
-        self.response_label.setFont(QFont("Montserrat", 14))
-        self.response_label.setStyleSheet("color: white;")
-        self.response_label.setAlignment(Qt.AlignCenter)
-        self.response_label.setWordWrap(True)
-        self.response_label.setGeometry(20, 140, self.width() - 40, 100)
-
-        # top-left mac buttons
-        self.close_btn = QPushButton(self)
-        self.close_btn.setGeometry(10, 10, 16, 16)
-        self.close_btn.setStyleSheet(self._btn_style("#FF5C5C"))
-        self.close_btn.clicked.connect(self._animate_close)
-
-        self.min_btn = QPushButton(self)
-        self.min_btn.setGeometry(36, 10, 16, 16)
-        self.min_btn.setStyleSheet(self._btn_style("#FFBD44"))
-        self.min_btn.clicked.connect(self._animate_minimize)
-
-        self.max_btn = QPushButton(self)
-        self.max_btn.setGeometry(62, 10, 16, 16)
-        self.max_btn.setStyleSheet(self._btn_style("#28C840"))
-        self.max_btn.clicked.connect(self.toggle_max_restore)
-
-        # settings button (tiny) top-right
-        self.settings_btn = QPushButton("⚙", self)
-        self.settings_btn.setGeometry(self.width() - 40, 8, 32, 20)
-        self.settings_btn.setStyleSheet("""
-            color: white;
-            background: rgba(255,255,255,8);
-            border-radius:6px;
-        """)
-        self.settings_btn.clicked.connect(self.open_settings)
-
-        # mic reselect button
-        self.mic_btn = QPushButton("Mic", self)
-        self.mic_btn.setGeometry(self.width() - 84, 8, 36, 20)
-        self.mic_btn.setStyleSheet("""
-            color: white;
-            background: rgba(255,255,255,6);
-            border-radius:6px;
-        """)
-        self.mic_btn.clicked.connect(self.reselect_mic_dialog)
-
-        # peach rose icon top-left but not overlapping buttons
-        self.icon_pix = self._build_peach_rose_icon(36)
-        self.icon_x = 96
-        self.icon_y = 6
-        self.icon_angle = 0.0
-        self._icon_timer = QTimer(self)
-        self._icon_timer.timeout.connect(self._icon_tick)
-        self._icon_timer.start(80)
-
-        # petals
-        self.petal_list: List[dict] = []
-
-        # animation states
-        self._grad_phase = 0.0
-        self._wave_phase = 0.0
-        self._fade_anim = None
-
-        # timers
-        self._grad_timer = QTimer(self)
-        self._grad_timer.timeout.connect(self._on_grad_tick)
-        self._grad_timer.start(36)
-
-        self._wave_timer = QTimer(self)
-        self._wave_timer.timeout.connect(self._on_wave_tick)
-        self._wave_timer.start(30)
-
-        # dragging/docking
-        self._drag_pos = None
-
-        # start mic listener (with optional forced index)
-        self._start_background_listener(self.forced_mic_index)
-
-        # greeting after show (animated)
-        QTimer.singleShot(700, self._greet)
-
-        # fade-in
-        self.setWindowOpacity(0.0)
-        self._animate_show()
-
-        # drop shadow
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(18)
-        shadow.setOffset(0, 6)
-        shadow.setColor(QColor(0, 0, 0, 160))
-        self.setGraphicsEffect(shadow)
-
-    # UI helpers
-    def _btn_style(self, color_hex: str) -> str:
-        return f"""
-            background-color: {color_hex};
-            border-radius: 7px;
-            border: 1px solid rgba(255,255,255,0.06);
-        """
-
-    def _build_peach_rose_icon(self, size_px: int) -> QPixmap:
-        pix = QPixmap(size_px, size_px)
-        pix.fill(Qt.transparent)
-        p = QPainter(pix)
-        p.setRenderHint(QPainter.Antialiasing)
-        center = size_px / 2
-        petal_color = QColor(255, 179, 153)
-        stroke = QColor(210, 120, 100)
-        p.setBrush(petal_color)
-        p.setPen(stroke)
-        for i in range(5):
-            angle = i * (360 / 5)
-            rad = math.radians(angle)
-            x = center + math.cos(rad) * (size_px * 0.12)
-            y = center + math.sin(rad) * (size_px * 0.12)
-            rect = QRect(int(x - size_px * 0.22), int(y - size_px * 0.22),
-                         int(size_px * 0.44), int(size_px * 0.44))
-            p.drawEllipse(rect)
-        p.setBrush(QColor(255, 140, 120))
-        p.drawEllipse(int(center - size_px * 0.12), int(center - size_px * 0.12),
-                      int(size_px * 0.24), int(size_px * 0.24))
-        p.end()
-        return pix
-
-    # Greeting
-    def _greet(self):
-        greeting = "Hi, I'm Rose, your healer. How can I assist you?"
-        self._type_animate_response(greeting)
-        # spawn petals + speak (pre-warm)
-        self._trigger_speaking_effects(greeting)
-        speak(greeting)
-
-    def _type_animate_response(self, text: str, interval_ms: int = 28):
-        # simple typewriter effect on response_label
-        self.response_label.setText("")
-        def worker():
-            cur = ""
-            for ch in text:
-                cur += ch
-                QTimer.singleShot(0, lambda c=cur: self.response_label.setText(c))
-                time.sleep(interval_ms / 1000.0)
-        threading.Thread(target=worker, daemon=True).start()
-
-    def update_response(self, text: str):
-        # immediate update (no typing)
-        self.response_label.setText(text)
-
-    # Animations
-    def _animate_show(self):
-        anim = QPropertyAnimation(self, b"windowOpacity")
-        anim.setDuration(420)
-        anim.setStartValue(0.0)
-        anim.setEndValue(1.0)
-        anim.setEasingCurve(QEasingCurve.InOutCubic)
-        anim.start()
-        self._fade_anim = anim
-
-    def _animate_close(self):
-        anim = QPropertyAnimation(self, b"windowOpacity")
-        anim.setDuration(340)
-        anim.setStartValue(self.windowOpacity())
-        anim.setEndValue(0.0)
-        anim.setEasingCurve(QEasingCurve.InOutCubic)
-        def do_close():
-            global BG_LISTENER_STOP
-            if BG_LISTENER_STOP:
-                try:
-                    BG_LISTENER_STOP(wait_for_stop=False)
-                except Exception:
-                    pass
-            self.close()
-        anim.finished.connect(do_close)
-        anim.start()
-        self._fade_anim = anim
-
-    def _animate_minimize(self):
-        anim = QPropertyAnimation(self, b"windowOpacity")
-        anim.setDuration(300)
-        anim.setStartValue(self.windowOpacity())
-        anim.setEndValue(0.0)
-        anim.setEasingCurve(QEasingCurve.InOutCubic)
-        def do_min():
-            self.showMinimized()
-            self.setWindowOpacity(0.0)
-        anim.finished.connect(do_min)
-        anim.start()
-        self._fade_anim = anim
-
-    def toggle_max_restore(self):
-        if self.isMaximized():
-            self.showNormal()
-        else:
-            self.showMaximized()
-
-    def _on_grad_tick(self):
-        self._grad_phase += 0.007 * (0.5 + 0.5 * self.theme_intensity)
-        if self._grad_phase > math.tau:
-            self._grad_phase -= math.tau
-        self.update()
-
-    def _on_wave_tick(self):
-        self._wave_phase += 0.16 * (0.8 + 0.4 * self.waveform_sensitivity)
-        if self._wave_phase > math.tau:
-            self._wave_phase -= math.tau
-        self.update(QRect(20, self.height() - 110, self.width() - 40, 100))
-
-    def _icon_tick(self):
-        self.icon_angle = (self.icon_angle + 0.7) % 360
-        self.update(QRect(self.icon_x, self.icon_y, 48, 48))
-
-    def paintEvent(self, ev: QPaintEvent):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        w, h = self.width(), self.height()
-        # matte black base
-        base = QColor(8, 8, 10, 220)
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, w, h, 20, 20)
-        painter.fillPath(path, base)
-
-        # frosted glass overlay simulation
-        painter.fillPath(path, QColor(255, 255, 255, int(6 * (0.6 + 0.4 * self.theme_intensity))))
-
-        # animated neon border (purple->pink->blue)
-        phase = self._grad_phase
-        c1 = QColor.fromHsv(int((270 + math.sin(phase) * 12) % 360), int(180*self.theme_intensity), 200)
-        c2 = QColor.fromHsv(int((320 + math.cos(phase*1.2) * 12) % 360), int(200*self.theme_intensity), 210)
-        border_grad = QLinearGradient(0, 0, w, 0)
-        border_grad.setColorAt(0.0, c1)
-        border_grad.setColorAt(0.5, c2)
-        border_grad.setColorAt(1.0, c1)
-        pen = painter.pen()
-        pen.setWidth(2)
-        pen.setBrush(border_grad)
-        painter.setPen(pen)
-        painter.drawRoundedRect(1, 1, w - 2, h - 2, 20, 20)
-
-        # inner subtle glow
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QColor(255, 255, 255, 8))
-        painter.drawRoundedRect(10, 10, w - 20, h - 20, 16, 16)
-
-        # neon corner accents
-        accent_size = 12
-        corner_grad = QLinearGradient(0, 0, accent_size, accent_size)
-        corner_grad.setColorAt(0.0, c1)
-        corner_grad.setColorAt(1.0, c2)
-        painter.setBrush(corner_grad)
-        painter.drawEllipse(6, 6, 8, 8)  # top-left tiny
-
-        # draw rotating peach icon
-        painter.save()
-        painter.translate(self.icon_x + self.icon_pix.width()/2, self.icon_y + self.icon_pix.height()/2)
-        painter.rotate(self.icon_angle)
-        painter.translate(- (self.icon_x + self.icon_pix.width()/2), - (self.icon_y + self.icon_pix.height()/2))
-        painter.drawPixmap(self.icon_x, self.icon_y, self.icon_pix)
-        painter.restore()
-
-        # title glow and color (speaking changes color)
-        with TTS_LOCK:
-            speaking = TTS_PLAYING
-        base_col = QColor(255, 190, 180) if speaking else QColor(190, 0, 255)
-
-        title_rect = self.title_label.geometry()
-        for i in range(4, 0, -1):
-            alpha = max(6, 36 // i)
-            col = QColor(base_col.red(), base_col.green(), base_col.blue(), alpha)
-            painter.setPen(col)
-            painter.setFont(QFont("Montserrat", 30 + i, QFont.Bold))
-            painter.drawText(title_rect, Qt.AlignCenter, self.title_label.text())
-        painter.setPen(QColor(255, 255, 255))
-        painter.setFont(QFont("Montserrat", 30, QFont.Bold))
-        painter.drawText(title_rect, Qt.AlignCenter, self.title_label.text())
-
-        # waveform draw
-        self._draw_waveform(painter, speaking)
-
-        # petals
-        self._draw_petals(painter)
-
-    def _draw_waveform(self, painter: QPainter, active: bool):
-        bar_count = max(8, int(self.width() / 26))
-        rect_w = self.width() - 60
-        rect_h = 68 if active else 36
-        x0 = 30
-        y0 = self.height() - 120 if active else self.height() - 90
-        spacing = rect_w / bar_count
-        for i in range(bar_count):
-            phase = self._wave_phase + (i * 0.28)
-            if active:
-                amp = 0.25 + 0.75 * (0.5 + 0.5 * math.sin(phase * 1.6))
-                amp *= (0.8 + 0.6 * self.waveform_sensitivity)
-            else:
-                amp = 0.45 + 0.12 * math.sin(phase * 0.9)
-            bar_h = rect_h * amp
-            bx = int(x0 + i * spacing + spacing * 0.12)
-            bw = int(spacing * 0.72)
-            by = int(y0 + (rect_h - bar_h) / 2)
-            alpha = int(110 + 80 * amp) if active else int(60 + 40 * amp)
-            hue = 300 + 30 * math.sin(phase + self._grad_phase)
-            col = QColor.fromHsv(int(hue) % 360, int(180*self.theme_intensity), 230, alpha)
-            painter.setBrush(col)
-            painter.setPen(Qt.NoPen)
-            painter.drawRoundedRect(bx, by, bw, int(bar_h), 6, 6)
-
-    def _draw_petals(self, painter: QPainter):
-        now = time.time()
-        self.petal_list = [p for p in self.petal_list if now < p['end']]
-        for p in self.petal_list:
-            progress = (now - p['start']) / (p['end'] - p['start'])
-            x = p['x'] + p['dx'] * progress
-            y = p['y'] + p['dy'] * progress + (progress**1.5) * 30
-            alpha = int(255 * (1 - progress))
-            col = QColor(255, 190, 170, alpha)
-            painter.setBrush(col)
-            painter.setPen(Qt.NoPen)
-            size = max(4, int(6 * (1 - progress) + 3))
-            painter.drawEllipse(int(x), int(y), size, size)
-
-    def _trigger_speaking_effects(self, text: str):
-        now = time.time()
-        cnt = min(12, max(6, len(text.split()) // 3))
-        for i in range(cnt):
-            self.petal_list.append({
-                'x': self.icon_x + random.randint(-6, 18),
-                'y': self.icon_y + random.randint(6, 18),
-                'dx': random.uniform(-26, 26),
-                'dy': random.uniform(40, 96),
-                'start': now + random.uniform(0.0, 0.06 * i),
-                'end': now + 0.9 + (i * 0.05)
-            })
-
-    # --------------- Microphone management ---------------
-    def _start_background_listener(self, forced_index: Optional[int] = None):
-        recognizer_test = sr.Recognizer()
-        available = sr.Microphone.list_microphone_names()
-        mic_index = None
-
-        if forced_index is not None and 0 <= forced_index < len(available):
-            mic_index = forced_index
-            print("Forced mic index selected:", mic_index, available[mic_index])
-        else:
-            # prefer non-virtual devices
-            bad_keywords = ("Sound Mapper", "Microsoft Sound Mapper", "Primary Sound Driver", "Stereo Mix")
-            for i, name in enumerate(available):
-                if any(bk in name for bk in bad_keywords):
-                    continue
-                try:
-                    with sr.Microphone(device_index=i) as src:
-                        recognizer_test.adjust_for_ambient_noise(src, duration=0.6)
-                    mic_index = i
-                    print("Auto-selected mic:", name)
-                    break
-                except Exception:
-                    continue
-            if mic_index is None and available:
-                mic_index = 0
-                print("Falling back to mic:", available[0])
-
-        if mic_index is None:
-            print("No microphone found")
-            self.update_response("No microphone found")
-            return
-
-        mic = sr.Microphone(device_index=mic_index)
-        self.current_mic_index = mic_index
-
-        def callback(recognizer_obj, audio):
-            with TTS_LOCK:
-                if TTS_PLAYING:
-                    return
-            try:
-                text = recognizer_obj.recognize_google(audio)
-                if text and text.strip():
-                    threading.Thread(target=handle_command, args=(text, self), daemon=True).start()
-            except sr.UnknownValueError:
-                return
-            except sr.RequestError as e:
-                print("Speech recognition request error:", e)
-                return
-            except Exception as e:
-                print("Recognition callback error:", e)
-                return
-
-        global BG_LISTENER_STOP
-        try:
-            rec = sr.Recognizer()
-            BG_LISTENER_STOP = rec.listen_in_background(mic, callback, phrase_time_limit=4)
-            print("Started background listener on index", mic_index)
-        except Exception as e:
-            print("listen_in_background failed:", e)
-            # fallback to blocking in thread
-            threading.Thread(target=self._fallback_listen_loop, args=(mic,), daemon=True).start()
-
-    def _fallback_listen_loop(self, mic):
-        r = sr.Recognizer()
-        r.dynamic_energy_threshold = True
-        r.pause_threshold = 0.35
-        while LISTENING:
-            try:
-                with mic as source:
-                    r.adjust_for_ambient_noise(source, duration=0.6)
-                    audio = r.listen(source, phrase_time_limit=5)
-            except Exception as e:
-                print("Mic capture error:", e)
-                time.sleep(0.2)
-                continue
-            try:
-                text = r.recognize_google(audio)
-                if text and text.strip():
-                    threading.Thread(target=handle_command, args=(text, self), daemon=True).start()
-            except sr.UnknownValueError:
-                continue
-            except sr.RequestError as e:
-                print("SR request error:", e)
-                time.sleep(0.5)
-                continue
-            except Exception as e:
-                print("Fallback recognition error:", e)
-                time.sleep(0.5)
-                continue
-
-    def reselect_mic_dialog(self):
-        # show mic list and let user pick
-        dlg = QDialog(self)
-        dlg.setWindowTitle("Select Microphone")
-        layout = QVBoxLayout()
-        combo = QComboBox()
-        mics = sr.Microphone.list_microphone_names()
-        combo.addItem("Auto-detect")
-        for m in mics:
-            combo.addItem(m)
-        layout.addWidget(combo)
-        btns = QHBoxLayout()
-        ok = QPushButton("OK")
-        cancel = QPushButton("Cancel")
-        btns.addWidget(ok); btns.addWidget(cancel)
-        layout.addLayout(btns)
-        dlg.setLayout(layout)
-        def do_ok():
-            idx = combo.currentIndex()
-            if idx == 0:
-                self.forced_mic_index = None
-            else:
-                self.forced_mic_index = idx - 1
-            # restart listener
-            self._restart_listener()
-            dlg.accept()
-        ok.clicked.connect(do_ok)
-        cancel.clicked.connect(dlg.reject)
-        dlg.exec()
-
-    def _restart_listener(self):
-        global BG_LISTENER_STOP
-        try:
-            if BG_LISTENER_STOP:
-                BG_LISTENER_STOP(wait_for_stop=False)
-        except Exception:
-            pass
-        time.sleep(0.12)
-        self._start_background_listener(self.forced_mic_index)
-
-    # ---------------- Docking/snapping & input events ----------------
-    def _snap_to_edge_if_close(self):
-        screen = QApplication.primaryScreen().availableGeometry()
-        px, py = self.pos().x(), self.pos().y()
-        w, h = self.width(), self.height()
-        if abs(px - screen.x()) < DOCK_THRESHOLD:
-            self.move(screen.x(), py)
-        if abs((px + w) - (screen.x() + screen.width())) < DOCK_THRESHOLD:
-            self.move(screen.x() + screen.width() - w, py)
-        if abs(py - screen.y()) < DOCK_THRESHOLD:
-            self.move(self.pos().x(), screen.y())
-        if abs((py + h) - (screen.y() + screen.height())) < DOCK_THRESHOLD:
-            self.move(self.pos().x(), screen.y() + screen.height() - h)
-
-    def mousePressEvent(self, ev):
-        if ev.button() == Qt.LeftButton:
-            self._drag_pos = ev.globalPosition().toPoint() - self.frameGeometry().topLeft()
-            ev.accept()
-
-    def mouseMoveEvent(self, ev):
-        if self._drag_pos is not None and ev.buttons() & Qt.LeftButton:
-            self.move(ev.globalPosition().toPoint() - self._drag_pos)
-            ev.accept()
-
-    def mouseReleaseEvent(self, ev):
-        self._snap_to_edge_if_close()
-        self._drag_pos = None
-        ev.accept()
-
-    def resizeEvent(self, ev):
-        self.title_label.setGeometry(0, 40, self.width(), 54)
-        self.response_label.setGeometry(20, 140, self.width() - 40, 100)
-        self.settings_btn.setGeometry(self.width() - 40, 8, 32, 20)
-        self.mic_btn.setGeometry(self.width() - 84, 8, 36, 20)
-        QWidget.resizeEvent(self, ev)
-
-    def closeEvent(self, ev):
-        global LISTENING, BG_LISTENER_STOP
-        LISTENING = False
-        if BG_LISTENER_STOP:
-            try:
-                BG_LISTENER_STOP(wait_for_stop=False)
-            except Exception:
-                pass
-        time.sleep(0.12)
-        ev.accept()
-
-    # ---------------- Settings UI ----------------
-    def open_settings(self):
-        dlg = SettingsDialog(self)
-        if dlg.exec():
-            # user saved - apply settings (already done in dialog)
-            self.update_response("Settings saved")
-            # restart mic if forced changed
-            self._restart_listener()
-
-# ---------------- Main ----------------
-def main():
-    app = QApplication(sys.argv)
-    hud = NeonHUD()
-    hud.show()
-
-    # pre-warm TTS quietly so first speak is snappy (optional)
-    QTimer.singleShot(1000, lambda: speak("Ready"))
-
-    sys.exit(app.exec())
-
-if __name__ == "__main__":
-    main()
+# rose_v26_5_ui_plus.py
+# Rose v26.5+ — UI + settings + mic reselect + optional Spotify Web API (fallback: media keys)
+# Requirements:
+#   pip install PySide6 speechrecognition edge-tts pytube
+# Optional:
+#   pip install spotipy
+
+import sys
+import os
+import re
+import json
+import math
+import time
+import asyncio
+import threading
+import webbrowser
+import platform
+import subprocess
+import shutil
+import socket
+import queue
+import hashlib
+import tempfile
+from pathlib import Path
+from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PySide6.QtCore import Qt, QTimer, QRect, QEasingCurve, QPropertyAnimation, QPoint, QObject, Signal, QEvent
+from PySide6.QtWidgets import (
+    QApplication, QWidget, QLabel, QPushButton, QGraphicsDropShadowEffect,
+    QDialog, QVBoxLayout, QHBoxLayout, QSlider, QComboBox, QFormLayout, QLineEdit, QMessageBox, QCheckBox
+)
+from PySide6.QtGui import QFont, QPainter, QLinearGradient, QColor, QBrush, QPixmap, QPainterPath, QPaintEvent, QTransform, QImage
+
+import numpy as np
+import requests
+from rose_kernels import wave_bars, petal_step
+import speech_recognition as sr
+import edge_tts
+from pytube import Search
+
+# Try optional spotify web api
+SPOTIFY_AVAILABLE = False
+try:
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+    SPOTIFY_AVAILABLE = True
+except Exception:
+    SPOTIFY_AVAILABLE = False
+
+# Try optional local ASR (vosk). recognize_google posts each finished
+# utterance and blocks on the round-trip; on-device transcription cuts that
+# multi-second tail and works offline.
+VOSK_AVAILABLE = False
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except Exception:
+    VOSK_AVAILABLE = False
+
+# Try optional voice-activity detection. The energy gate lets keyboard
+# clicks and steady noise through to the recognizer; a real VAD drops them
+# before they cost a network round-trip.
+try:
+    import webrtcvad
+    _VAD = webrtcvad.Vad(2)
+except Exception:
+    _VAD = None
+
+# --------------- Globals ---------------
+LISTENING = True
+# set while the HUD is speaking; an Event read is a single atomic check,
+# so the paint loop and SR callbacks don't contend on a mutex
+TTS_EVENT = threading.Event()
+BG_LISTENER_STOP = None
+HUD_REF: Optional["NeonHUD"] = None
+
+# HUD sizing/docking
+DEFAULT_WIDTH = 540
+DEFAULT_HEIGHT = 320
+MIN_WIDTH = 380
+MIN_HEIGHT = 220
+DOCK_THRESHOLD = 36
+
+# ---------------- Helpers ----------------
+# platform.system() builds a fresh string per call (and may uname); the OS
+# doesn't change at runtime, so resolve it once
+_OS = platform.system()
+_IS_WIN = _OS == "Windows"
+_IS_MAC = _OS == "Darwin"
+_IS_LIN = not (_IS_WIN or _IS_MAC)
+try:
+    _LOGIN = os.getlogin()
+except OSError:
+    _LOGIN = os.environ.get("USERNAME", "")
+
+# PortAudio device enumeration takes tens to hundreds of ms and was done on
+# the UI thread every time a dialog opened; enumerate once and reuse
+_MIC_NAMES_CACHE: Optional[list] = None
+
+def _get_mic_names(force: bool = False) -> list:
+    global _MIC_NAMES_CACHE
+    if _MIC_NAMES_CACHE is None or force:
+        _MIC_NAMES_CACHE = sr.Microphone.list_microphone_names()
+    return _MIC_NAMES_CACHE
+
+_VOSK_MODEL = None
+_VOSK_LOCK = threading.Lock()
+
+def _get_vosk_model():
+    # model load takes seconds; share one instance across recognitions
+    global _VOSK_MODEL
+    with _VOSK_LOCK:
+        if _VOSK_MODEL is None:
+            _VOSK_MODEL = vosk.Model(lang="en-us")
+        return _VOSK_MODEL
+
+def _has_speech(audio) -> bool:
+    """True when the VAD finds voiced frames in the clip (or no VAD exists)."""
+    if _VAD is None:
+        return True
+    try:
+        raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        frame_len = 960  # 30 ms at 16 kHz, 16-bit mono
+        voiced = 0
+        for off in range(0, len(raw) - frame_len + 1, frame_len):
+            if _VAD.is_speech(raw[off:off + frame_len], 16000):
+                voiced += 1
+                if voiced >= 3:  # ~90 ms of speech
+                    return True
+        return False
+    except Exception:
+        return True  # never let the gate eat real commands on VAD errors
+
+def _recognize(recognizer_obj, audio) -> str:
+    """Transcribe on-device when vosk is installed, else via recognize_google."""
+    if VOSK_AVAILABLE:
+        try:
+            rec = vosk.KaldiRecognizer(_get_vosk_model(), 16000)
+            rec.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+            return json.loads(rec.FinalResult()).get("text", "")
+        except Exception as e:
+            print("Local ASR error, falling back to Google:", e)
+    return recognizer_obj.recognize_google(audio)
+
+def estimate_tts_duration(text: str) -> float:
+    words = len(text.split())
+    return max(0.5, words / 2.8)
+
+def _play_file_nonblocking(path: str):
+    try:
+        if _IS_WIN:
+            subprocess.Popen(["start", path], shell=True)
+        elif _IS_MAC:
+            subprocess.Popen(["afplay", path])
+        else:
+            subprocess.Popen(["xdg-open", path])
+    except Exception as e:
+        print("Playback error:", e)
+
+_FFPLAY = shutil.which("ffplay")
+
+# mpv can sit idle and take loadfile commands over IPC, so repeated speaks
+# skip process creation entirely; the socket also reports end-of-file, which
+# keeps the exact-completion mic gating intact
+_MPV = shutil.which("mpv")
+_MPV_IPC = (r"\\.\pipe\rose_mpv" if _IS_WIN
+            else os.path.join(tempfile.gettempdir(), "rose_mpv.sock"))
+_MPV_PROC = None
+_MPV_LOCK = threading.Lock()
+
+def _mpv_play_blocking(path: str) -> bool:
+    """Play via the persistent mpv and wait for its end-file event."""
+    global _MPV_PROC
+    if not _MPV:
+        return False
+    try:
+        with _MPV_LOCK:
+            if _MPV_PROC is None or _MPV_PROC.poll() is not None:
+                _MPV_PROC = subprocess.Popen(
+                    [_MPV, "--idle", "--no-video", "--no-terminal",
+                     f"--input-ipc-server={_MPV_IPC}"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                for _ in range(50):  # wait for the IPC endpoint to appear
+                    if _IS_WIN or os.path.exists(_MPV_IPC):
+                        break
+                    time.sleep(0.02)
+        cmd = (json.dumps({"command": ["loadfile", path]}) + "\n").encode()
+        if _IS_WIN:
+            with open(_MPV_IPC, "r+b", buffering=0) as pipe:
+                pipe.write(cmd)
+                while True:
+                    line = pipe.readline()
+                    if not line or b'"end-file"' in line:
+                        return True
+        else:
+            with socket.socket(socket.AF_UNIX) as s:
+                s.connect(_MPV_IPC)
+                s.sendall(cmd)
+                buf = b""
+                while True:
+                    data = s.recv(4096)
+                    if not data:
+                        return True
+                    buf += data
+                    if b'"end-file"' in buf:
+                        return True
+    except Exception as e:
+        print("mpv playback error:", e)
+        return False
+
+def _stop_mpv():
+    global _MPV_PROC
+    if _MPV_PROC is not None and _MPV_PROC.poll() is None:
+        _MPV_PROC.terminate()
+    _MPV_PROC = None
+
+def _play_file_blocking(path: str) -> bool:
+    """Play `path` and return True once playback actually finished.
+
+    Returns False when no player that signals completion is available,
+    in which case the caller must fall back to a duration estimate.
+    """
+    if _mpv_play_blocking(path):
+        return True
+    try:
+        if _FFPLAY:
+            subprocess.Popen([_FFPLAY, "-nodisp", "-autoexit", "-loglevel", "quiet", path]).wait()
+            return True
+        if _IS_MAC:
+            subprocess.Popen(["afplay", path]).wait()
+            return True
+    except Exception as e:
+        print("Playback error:", e)
+    return False
+
+# ---------------- TTS ----------------
+async def _edge_save(text: str, filename: str = "speech.mp3"):
+    comm = edge_tts.Communicate(text, "en-US-JennyNeural")
+    await comm.save(filename)
+
+# one long-lived loop for all TTS coroutines; asyncio.run per utterance
+# created and tore down a loop (plus edge-tts' connection state) every call
+TTS_LOOP = asyncio.new_event_loop()
+threading.Thread(target=TTS_LOOP.run_forever, daemon=True).start()
+
+# synthesized audio cached by text hash; canned replies ("Next track",
+# "Muted", the greeting) skip the network round-trip after the first use
+_TTS_CACHE_DIR = Path(tempfile.gettempdir()) / "rose_tts"
+_TTS_CACHE_DIR.mkdir(exist_ok=True)
+
+_COMMON_REPLIES = (
+    "Ready", "Hello. I'm Rose, your healer.", "Toggling Spotify",
+    "Next track", "Previous track", "Opening browser",
+)
+
+def _tts_cache_path(text: str) -> Path:
+    return _TTS_CACHE_DIR / (hashlib.sha1(text.encode()).hexdigest() + ".mp3")
+
+def _ensure_tts_file(text: str) -> str:
+    path = _tts_cache_path(text)
+    if not path.exists():
+        asyncio.run_coroutine_threadsafe(_edge_save(text, str(path)), TTS_LOOP).result()
+    return str(path)
+
+def prewarm_tts():
+    """Synthesize the fixed command replies ahead of first use."""
+    def warm():
+        # submit everything at once: the coroutines share the persistent
+        # loop, so the phrases synthesize concurrently over warm connections
+        futures = [
+            asyncio.run_coroutine_threadsafe(_edge_save(p, str(_tts_cache_path(p))), TTS_LOOP)
+            for p in _COMMON_REPLIES if not _tts_cache_path(p).exists()
+        ]
+        for f in futures:
+            try:
+                f.result()
+            except Exception:
+                return  # offline; speak() will retry on demand
+    threading.Thread(target=warm, daemon=True).start()
+
+def speak(text: str):
+    """Generate TTS and play it. Triggers HUD visual effects if HUD_REF is set."""
+    def runner():
+        global HUD_REF
+        # ask HUD to spawn petals right before voice; the signal emit is
+        # thread-safe, unlike starting a QTimer from a worker thread
+        try:
+            if HUD_REF:
+                HUD_REF._speak_bridge.triggered.emit(text)
+        except Exception:
+            pass
+
+        TTS_EVENT.set()
+        try:
+            path = _ensure_tts_file(text)
+            # exact completion keeps the mic muted precisely as long as we
+            # speak; the estimate (with its 0.35s guardband) is last resort
+            if not _play_file_blocking(path):
+                _play_file_nonblocking(path)
+                time.sleep(estimate_tts_duration(text) + 0.35)
+        except Exception as e:
+            print("TTS error:", e)
+        finally:
+            TTS_EVENT.clear()
+    threading.Thread(target=runner, daemon=True).start()
+
+# ---------------- YouTube ----------------
+# background lookups run on a small worker pool; a plain GET + regex pulls
+# the first videoId out of the results page without pytube's full object
+# model, with pytube as fallback in case the page markup shifts. Resolved
+# URLs land in _WATCH_CACHE so repeat requests play the video directly.
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2)
+_YT_SESSION = requests.Session()
+_VID_RE = re.compile(r'"videoId":"([A-Za-z0-9_-]{11})"')
+_WATCH_CACHE: dict = {}
+
+def _resolve_watch_url(query: str) -> str:
+    try:
+        r = _YT_SESSION.get(f"https://www.youtube.com/results?search_query={quote_plus(query)}",
+                            timeout=3)
+        m = _VID_RE.search(r.text)
+        if m:
+            return f"https://www.youtube.com/watch?v={m.group(1)}"
+    except Exception:
+        pass
+    s = Search(query)
+    if not getattr(s, "results", None):
+        raise LookupError("no results")
+    first = s.results[0]
+    return getattr(first, "watch_url", None) or f"https://www.youtube.com/watch?v={first.video_id}"
+
+def _warm_watch_url(query: str):
+    try:
+        if len(_WATCH_CACHE) > 256:
+            _WATCH_CACHE.clear()
+        _WATCH_CACHE[query] = _resolve_watch_url(query)
+    except Exception as e:
+        print("YT error", e)
+
+def play_youtube_song(song: str):
+    q = song.strip()
+    if not q:
+        webbrowser.open("https://www.youtube.com")
+        return
+    # respond at webbrowser.open speed: a cached resolution plays the video
+    # directly, otherwise the results page opens now and the first-video
+    # lookup warms the cache off the command path
+    url = _WATCH_CACHE.get(q)
+    if url:
+        webbrowser.open(url)
+        return
+    webbrowser.open(f"https://www.youtube.com/results?search_query={quote_plus(q)}")
+    _SEARCH_POOL.submit(_warm_watch_url, q)
+
+# ---------------- Spotify control (two modes) ----------------
+# ctypes structures and the user32 handle are built once at import; the old
+# per-call class definitions cost milliseconds of metaclass work per press
+if _IS_WIN:
+    import ctypes
+    from ctypes import wintypes
+
+    _USER32 = ctypes.WinDLL('user32', use_last_error=True)
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = (("wVk", wintypes.WORD),
+                    ("wScan", wintypes.WORD),
+                    ("dwFlags", wintypes.DWORD),
+                    ("time", wintypes.DWORD),
+                    ("dwExtraInfo", wintypes.ULONG_PTR))
+
+    class INPUT(ctypes.Structure):
+        _fields_ = (("type", wintypes.DWORD),
+                    ("ki", KEYBDINPUT))
+
+    # reusable down/up templates; only .ki.wVk changes per key press
+    _INPUT_DOWN = INPUT(type=INPUT_KEYBOARD,
+                        ki=KEYBDINPUT(wVk=0, wScan=0, dwFlags=KEYEVENTF_EXTENDEDKEY,
+                                      time=0, dwExtraInfo=0))
+    _INPUT_UP = INPUT(type=INPUT_KEYBOARD,
+                      ki=KEYBDINPUT(wVk=0, wScan=0, dwFlags=KEYEVENTF_EXTENDEDKEY | KEYEVENTF_KEYUP,
+                                    time=0, dwExtraInfo=0))
+    _INPUT_SIZE = ctypes.sizeof(INPUT)
+
+    def _send_media_key_windows(vk_code: int):
+        try:
+            _INPUT_DOWN.ki.wVk = vk_code
+            _INPUT_UP.ki.wVk = vk_code
+            _USER32.SendInput(1, ctypes.byref(_INPUT_DOWN), _INPUT_SIZE)
+            _USER32.SendInput(1, ctypes.byref(_INPUT_UP), _INPUT_SIZE)
+        except Exception as e:
+            print("Media key send failed:", e)
+else:
+    def _send_media_key_windows(vk_code: int):
+        pass  # media keys are Windows-only; macOS/Linux use osascript/playerctl
+
+def spotify_media_play_pause():
+    try:
+        if _IS_WIN:
+            _send_media_key_windows(0xB3)
+        elif _IS_MAC:
+            subprocess.Popen(["osascript", "-e", 'tell application "Spotify" to playpause'])
+        else:
+            _run_quiet([_PLAYERCTL, "play-pause"])
+    except Exception as e:
+        print("Spotify local play/pause error:", e)
+
+def spotify_media_next():
+    try:
+        if _IS_WIN:
+            _send_media_key_windows(0xB0)
+        elif _IS_MAC:
+            subprocess.Popen(["osascript", "-e", 'tell application "Spotify" to next track'])
+        else:
+            _run_quiet([_PLAYERCTL, "next"])
+    except Exception as e:
+        print("Spotify next error:", e)
+
+def spotify_media_prev():
+    try:
+        if _IS_WIN:
+            _send_media_key_windows(0xB1)
+        elif _IS_MAC:
+            subprocess.Popen(["osascript", "-e", 'tell application "Spotify" to previous track'])
+        else:
+            _run_quiet([_PLAYERCTL, "previous"])
+    except Exception as e:
+        print("Spotify prev error:", e)
+
+# Optional Spotify Web API wrapper (if spotipy present and env vars set)
+SPOTIFY_OAUTH = None
+SP_CLIENT = None
+if SPOTIFY_AVAILABLE:
+    try:
+        client_id = os.getenv("SPOTIPY_CLIENT_ID", "")
+        client_secret = os.getenv("SPOTIPY_CLIENT_SECRET", "")
+        redirect = os.getenv("SPOTIPY_REDIRECT_URI", "http://localhost:8888/callback")
+        if client_id and client_secret:
+            SPOTIFY_OAUTH = SpotifyOAuth(client_id=client_id, client_secret=client_secret, redirect_uri=redirect, scope="user-modify-playback-state,user-read-playback-state,user-read-currently-playing")
+            SP_CLIENT = spotipy.Spotify(auth_manager=SPOTIFY_OAUTH)
+            print("Spotify Web API initialized.")
+        else:
+            SPOTIFY_AVAILABLE = False
+    except Exception as e:
+        print("Spotify Web init error:", e)
+        SPOTIFY_AVAILABLE = False
+
+def spotify_web_play_search_and_play(query: str):
+    """Search using Spotify Web API and play on active device if possible."""
+    if not SPOTIFY_AVAILABLE or SP_CLIENT is None:
+        print("Spotify Web API not configured.")
+        return False
+    try:
+        result = SP_CLIENT.search(q=query, type="track", limit=1)
+        items = result.get("tracks", {}).get("items", [])
+        if not items:
+            return False
+        uri = items[0]["uri"]
+        # try to start playback on user's active device
+        SP_CLIENT.start_playback(uris=[uri])
+        return True
+    except Exception as e:
+        print("Spotify Web play error:", e)
+        return False
+
+# --------------- Volume & system ---------------
+# tool paths resolved once at import instead of a PATH search per command
+_NIRCMD = shutil.which("nircmd.exe") or "nircmd.exe"
+_PLAYERCTL = shutil.which("playerctl") or "playerctl"
+
+def _run_quiet(argv: list):
+    # argv array: no /bin/sh or cmd.exe fork in the middle
+    subprocess.Popen(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+# Windows: an in-process COM endpoint changes volume in microseconds,
+# versus forking nircmd per command; resolved once, argv path as fallback
+_VOLUME_ENDPOINT = None
+if _IS_WIN:
+    try:
+        from ctypes import cast, POINTER
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        _speakers = AudioUtilities.GetSpeakers()
+        _VOLUME_ENDPOINT = cast(
+            _speakers.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None),
+            POINTER(IAudioEndpointVolume))
+    except Exception:
+        _VOLUME_ENDPOINT = None
+
+def adjust_volume(cmd: str):
+    try:
+        if _IS_WIN:
+            if _VOLUME_ENDPOINT is not None:
+                vol = _VOLUME_ENDPOINT
+                if "up" in cmd:
+                    vol.SetMasterVolumeLevelScalar(min(1.0, vol.GetMasterVolumeLevelScalar() + 0.05), None)
+                elif "down" in cmd:
+                    vol.SetMasterVolumeLevelScalar(max(0.0, vol.GetMasterVolumeLevelScalar() - 0.05), None)
+                elif "unmute" in cmd:
+                    vol.SetMute(0, None)
+                elif "mute" in cmd:
+                    vol.SetMute(1, None)
+                return
+            if "up" in cmd: _run_quiet([_NIRCMD, "changesysvolume", "5000"])
+            elif "down" in cmd: _run_quiet([_NIRCMD, "changesysvolume", "-5000"])
+            elif "mute" in cmd: _run_quiet([_NIRCMD, "mutesysvolume", "1"])
+            elif "unmute" in cmd: _run_quiet([_NIRCMD, "mutesysvolume", "0"])
+        elif _IS_MAC:
+            if "up" in cmd: _run_quiet(["osascript", "-e", "set volume output volume (output volume of (get volume settings) + 10)"])
+            elif "down" in cmd: _run_quiet(["osascript", "-e", "set volume output volume (output volume of (get volume settings) - 10)"])
+        else:
+            if "up" in cmd: _run_quiet(["amixer", "-D", "pulse", "sset", "Master", "5%+"])
+            elif "down" in cmd: _run_quiet(["amixer", "-D", "pulse", "sset", "Master", "5%-"])
+    except Exception as e:
+        print("Volume control error:", e)
+
+def system_action(cmd: str):
+    try:
+        if "shutdown" in cmd:
+            if _IS_WIN: _run_quiet(["shutdown", "/s", "/t", "1"])
+            else: _run_quiet(["shutdown", "now"])
+        elif "restart" in cmd:
+            if _IS_WIN: _run_quiet(["shutdown", "/r", "/t", "1"])
+            else: _run_quiet(["reboot"])
+    except Exception as e:
+        print("System action error:", e)
+
+# ---------------- Command processor ----------------
+# keyword -> (category, action); one pass over the utterance replaces the
+# ~15 serial any(...) substring sweeps the old if-chain did per command
+_KEYWORD_INTENTS = [
+    ("spotify", ("spotify", "marker")),
+    ("play", ("spotify", "toggle")),
+    ("pause", ("spotify", "toggle")),
+    ("toggle", ("spotify", "toggle")),
+    ("next", ("spotify", "next")),
+    ("skip", ("spotify", "next")),
+    ("previous", ("spotify", "prev")),
+    ("prev", ("spotify", "prev")),
+    ("back", ("spotify", "prev")),
+    ("volume up", ("volume", "up")),
+    ("increase volume", ("volume", "up")),
+    ("higher volume", ("volume", "up")),
+    ("volume down", ("volume", "down")),
+    ("decrease volume", ("volume", "down")),
+    ("lower volume", ("volume", "down")),
+    ("unmute", ("volume", "unmute")),
+    ("mute", ("volume", "mute")),
+    ("shutdown", ("system", "shutdown")),
+    ("restart", ("system", "restart")),
+    ("open chrome", ("app", "browser")),
+    ("open brave", ("app", "browser")),
+    ("open browser", ("app", "browser")),
+    ("open vscode", ("app", "vscode")),
+    ("open code", ("app", "vscode")),
+    ("hello", ("greet", "hello")),
+    ("hi", ("greet", "hello")),
+    ("hey", ("greet", "hello")),
+]
+
+# all keywords folded into one alternation so an utterance is scanned by a
+# single compiled automaton instead of ~25 separate substring sweeps;
+# longest-first ordering makes "volume up" win over bare "up"-style overlaps
+_KEYWORD_MAP = dict(_KEYWORD_INTENTS)
+_INTENT_RE = re.compile("|".join(
+    re.escape(kw) for kw, _ in sorted(_KEYWORD_INTENTS, key=lambda it: -len(it[0]))))
+
+def _match_intents(cmd_norm: str):
+    return {_KEYWORD_MAP[m] for m in _INTENT_RE.findall(cmd_norm)}
+
+def _do_spotify(act, cmd_norm, hud_ref):
+    if act == "toggle":
+        # prefer web API for "play <song> on spotify" if configured
+        if SPOTIFY_AVAILABLE and SP_CLIENT and cmd_norm.startswith("play "):
+            q = cmd_norm.replace("play", "").replace("spotify", "").strip()
+            if q and spotify_web_play_search_and_play(q):
+                speak(f"Playing {q} on Spotify")
+                return
+        spotify_media_play_pause()
+        speak("Toggling Spotify")
+    elif act == "next":
+        spotify_media_next(); speak("Next track")
+    else:
+        spotify_media_prev(); speak("Previous track")
+
+def _do_volume(act, cmd_norm, hud_ref):
+    adjust_volume(act)
+    msg = {"up": "Volume increased", "down": "Volume decreased",
+           "mute": "Muted", "unmute": "Unmuted"}[act]
+    speak(msg)
+    if hud_ref: hud_ref.update_response(msg)
+
+def _do_system(act, cmd_norm, hud_ref):
+    if act == "shutdown":
+        if hud_ref: hud_ref.update_response("Shutting down...")
+        speak("Shutting down the system")
+    else:
+        if hud_ref: hud_ref.update_response("Restarting...")
+        speak("Restarting the system")
+    system_action(act)
+
+def _do_app(act, cmd_norm, hud_ref):
+    if act == "browser":
+        speak("Opening browser")
+        if _IS_WIN:
+            brave = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
+            chrome = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+            if os.path.exists(brave): subprocess.Popen([brave])
+            elif os.path.exists(chrome): subprocess.Popen([chrome])
+            else: webbrowser.open("https://www.google.com")
+        else:
+            webbrowser.open("https://www.google.com")
+    else:
+        speak("Opening Visual Studio Code")
+        code_path = rf"C:\Users\{_LOGIN}\AppData\Local\Programs\Microsoft VS Code\Code.exe"
+        if _IS_WIN and os.path.exists(code_path):
+            subprocess.Popen([code_path])
+        else:
+            webbrowser.open("https://code.visualstudio.com")
+
+def _do_greet(act, cmd_norm, hud_ref):
+    speak("Hello. I'm Rose, your healer.")
+    if hud_ref: hud_ref.update_response("Hello. I'm Rose, your healer.")
+
+_INTENT_DISPATCH = {
+    "spotify": _do_spotify,
+    "volume": _do_volume,
+    "system": _do_system,
+    "app": _do_app,
+    "greet": _do_greet,
+}
+
+# resolution order mirrors the old if-chain precedence
+_INTENT_PRECEDENCE = [
+    ("spotify", "toggle"), ("spotify", "next"), ("spotify", "prev"),
+    ("volume", "up"), ("volume", "down"), ("volume", "mute"), ("volume", "unmute"),
+    ("system", "shutdown"), ("system", "restart"),
+    ("app", "browser"), ("app", "vscode"),
+    ("greet", "hello"),
+]
+
+def handle_command(cmd: str, hud_ref: Optional["NeonHUD"] = None):
+    if not cmd:
+        return
+    cmd_norm = cmd.lower().strip()
+    if hud_ref:
+        hud_ref.update_response(f"You said: {cmd_norm}")
+
+    matches = _match_intents(cmd_norm)
+    if ("volume", "unmute") in matches:
+        matches.discard(("volume", "mute"))  # "unmute" always contains "mute"
+    if ("spotify", "marker") not in matches:
+        # play/next/... keywords only mean Spotify when "spotify" was said
+        matches = {t for t in matches if t[0] != "spotify"}
+
+    # "play <song>" defaults to YouTube unless aimed at Spotify
+    if not any(t[0] == "spotify" for t in matches) and cmd_norm.startswith("play "):
+        song = cmd_norm.replace("play", "", 1).replace("on youtube", "").replace("youtube", "").strip()
+        if song:
+            if hud_ref: hud_ref.update_response(f"Playing {song} on YouTube...")
+            speak(f"Playing {song} on YouTube")
+            play_youtube_song(song)
+            return
+
+    for tag in _INTENT_PRECEDENCE:
+        if tag in matches:
+            cat, act = tag
+            _INTENT_DISPATCH[cat](act, cmd_norm, hud_ref)
+            return
+
+    # Fallback
+    speak(f"I heard: {cmd_norm}")
+    if hud_ref: hud_ref.update_response(f"I heard: {cmd_norm}")
+
+# recognition work funnels through one queue + worker: clips captured in a
+# burst amortize onto a single long-lived thread and commands run in the
+# order the utterances arrived
+_ASR_QUEUE: "queue.Queue" = queue.Queue()
+
+def _asr_worker():
+    while True:
+        recognizer_obj, audio, hud = _ASR_QUEUE.get()
+        try:
+            if not _has_speech(audio):
+                continue  # noise/clicks; skip the recognizer entirely
+            text = _recognize(recognizer_obj, audio)
+            if text and text.strip():
+                handle_command(text, hud)
+        except sr.UnknownValueError:
+            pass
+        except sr.RequestError as e:
+            print("Speech recognition request error:", e)
+        except Exception as e:
+            print("Recognition worker error:", e)
+        finally:
+            _ASR_QUEUE.task_done()
+
+threading.Thread(target=_asr_worker, daemon=True).start()
+
+# ---------------- Settings dialog ----------------
+class SettingsDialog(QDialog):
+    def __init__(self, parent: "NeonHUD"):
+        super().__init__(parent)
+        self.setWindowTitle("Rose Settings")
+        self.setModal(True)
+        self.parent = parent
+        self.setMinimumWidth(420)
+        layout = QVBoxLayout()
+
+        form = QFormLayout()
+
+        # theme intensity slider (0..100)
+        self.theme_slider = QSlider(Qt.Horizontal)
+        self.theme_slider.setRange(0, 100)
+        self.theme_slider.setValue(int(parent.theme_intensity * 100))
+        form.addRow("Theme intensity", self.theme_slider)
+
+        # waveform sensitivity
+        self.wave_slider = QSlider(Qt.Horizontal)
+        self.wave_slider.setRange(1, 200)
+        self.wave_slider.setValue(int(parent.waveform_sensitivity * 100))
+        form.addRow("Waveform sensitivity", self.wave_slider)
+
+        # mic device selector (cached names; refresh re-enumerates)
+        self.mic_combo = QComboBox()
+        self._fill_mic_combo(_get_mic_names())
+        # select current
+        if parent.forced_mic_index is None:
+            self.mic_combo.setCurrentIndex(0)
+        else:
+            idx = parent.forced_mic_index + 1
+            if idx < self.mic_combo.count():
+                self.mic_combo.setCurrentIndex(idx)
+        mic_row = QHBoxLayout()
+        mic_row.addWidget(self.mic_combo)
+        refresh_btn = QPushButton("↻")
+        refresh_btn.setFixedWidth(28)
+        refresh_btn.clicked.connect(lambda: self._fill_mic_combo(_get_mic_names(force=True)))
+        mic_row.addWidget(refresh_btn)
+        form.addRow("Microphone override", mic_row)
+
+        # spotify web toggle
+        self.spotify_checkbox = QCheckBox("Enable Spotify Web API (requires env vars)")
+        self.spotify_checkbox.setChecked(bool(SPOTIFY_AVAILABLE and SP_CLIENT))
+        form.addRow(self.spotify_checkbox)
+
+        layout.addLayout(form)
+
+        btns = QHBoxLayout()
+        save_btn = QPushButton("Save")
+        cancel_btn = QPushButton("Cancel")
+        save_btn.clicked.connect(self.on_save)
+        cancel_btn.clicked.connect(self.reject)
+        btns.addWidget(save_btn)
+        btns.addWidget(cancel_btn)
+        layout.addLayout(btns)
+        self.setLayout(layout)
+
+    def _fill_mic_combo(self, mics: list):
+        self.mic_combo.clear()
+        self.mic_combo.addItem("Auto-detect")
+        for m in mics:
+            self.mic_combo.addItem(m)
+
+    def on_save(self):
+        # theme intensity
+        val = self.theme_slider.value()
+        self.parent.theme_intensity = val / 100.0
+        self.parent.waveform_sensitivity = self.wave_slider.value() / 100.0
+        self.parent._title_cache.clear()  # glow bakes in theme intensity
+        self.parent._build_hue_lut()      # so does the waveform palette
+        self.parent._build_border_ring()  # and the border color ring
+        self.parent._bg_frames = [None] * 64  # frames bake the old colors
+        # mic override
+        idx = self.mic_combo.currentIndex()
+        if idx == 0:
+            self.parent.forced_mic_index = None
+        else:
+            self.parent.forced_mic_index = idx - 1
+        # spotify web toggle - user must have env vars
+        # just notify user; actual SP_CLIENT config is global
+        if self.spotify_checkbox.isChecked() and not SPOTIFY_AVAILABLE:
+            QMessageBox.information(self, "Spotify", "Spotify Web API not configured or spotipy not installed.")
+        self.accept()
+
+# ---------------- NeonHUD ----------------
+class _SpeakBridge(QObject):
+    """Marshals speak() worker-thread triggers onto the GUI thread via a signal."""
+    triggered = Signal(str)
+
+class NeonHUD(QWidget):
+    def __init__(self):
+        super().__init__()
+        global HUD_REF
+        HUD_REF = self
+
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.resize(DEFAULT_WIDTH, DEFAULT_HEIGHT)
+        self.setMinimumSize(MIN_WIDTH, MIN_HEIGHT)
+
+        # cross-thread trigger for speaking effects (speak() runs in a worker)
+        self._speak_bridge = _SpeakBridge()
+        self._speak_bridge.triggered.connect(self._trigger_speaking_effects)
+        self._last_effect_ts = 0.0
+
+        # visual params
+        self.theme_intensity = 0.9   # 0..1
+        self.waveform_sensitivity = 1.0
+        self.forced_mic_index: Optional[int] = None
+
+        # title & response
+        self.title_label = QLabel("ROSE", self)
+        self.title_label.setFont(QFont("Montserrat", 30, QFont.Bold))
+        self.title_label.setStyleSheet("color: white;")
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.title_label.setGeometry(0, 40, self.width(), 54)
+
+        self.response_label = QLabel("", self)
+        self.response_label.setFont(QFont("Montserrat", 14))
+        self.response_label.setStyleSheet("color: white;")
+        self.response_label.setAlignment(Qt.AlignCenter)
+        self.response_label.setWordWrap(True)
+        self.response_label.setGeometry(20, 140, self.width() - 40, 100)
+
+        # top-left mac buttons
+        self.close_btn = QPushButton(self)
+        self.close_btn.setGeometry(10, 10, 16, 16)
+        self.close_btn.setStyleSheet(self._btn_style("#FF5C5C"))
+        self.close_btn.clicked.connect(self._animate_close)
+
+        self.min_btn = QPushButton(self)
+        self.min_btn.setGeometry(36, 10, 16, 16)
+        self.min_btn.setStyleSheet(self._btn_style("#FFBD44"))
+        self.min_btn.clicked.connect(self._animate_minimize)
+
+        self.max_btn = QPushButton(self)
+        self.max_btn.setGeometry(62, 10, 16, 16)
+        self.max_btn.setStyleSheet(self._btn_style("#28C840"))
+        self.max_btn.clicked.connect(self.toggle_max_restore)
+
+        # settings button (tiny) top-right
+        self.settings_btn = QPushButton("⚙", self)
+        self.settings_btn.setGeometry(self.width() - 40, 8, 32, 20)
+        self.settings_btn.setStyleSheet("""
+            color: white;
+            background: rgba(255,255,255,8);
+            border-radius:6px;
+        """)
+        self.settings_btn.clicked.connect(self.open_settings)
+
+        # mic reselect button
+        self.mic_btn = QPushButton("Mic", self)
+        self.mic_btn.setGeometry(self.width() - 84, 8, 36, 20)
+        self.mic_btn.setStyleSheet("""
+            color: white;
+            background: rgba(255,255,255,6);
+            border-radius:6px;
+        """)
+        self.mic_btn.clicked.connect(self.reselect_mic_dialog)
+
+        # peach rose icon top-left but not overlapping buttons
+        self.icon_pix = self._build_peach_rose_icon(36)
+        # 36 pre-rotated frames (10° steps): spinning the icon becomes a
+        # plain pixmap blit instead of a transform set-up every paint
+        self.icon_frames = [self.icon_pix.transformed(QTransform().rotate(a), Qt.SmoothTransformation)
+                            for a in range(0, 360, 10)]
+        self.icon_x = 96
+        self.icon_y = 6
+        self.icon_angle = 0.0
+        self._icon_timer = QTimer(self)
+        self._icon_timer.timeout.connect(self._icon_tick)
+        self._icon_timer.start(80)
+
+        # petals as struct-of-arrays: per-frame motion/alpha/size math is a
+        # few vector ops and expiry is a boolean mask, not a list rebuild
+        # (start/end hold epoch seconds, so keep them float64). Arrays are
+        # preallocated to capacity; _petal_n tracks the live count so bursts
+        # fill slices instead of reallocating via concatenate.
+        self._petal_cap = 64
+        self.petals = {k: np.zeros(self._petal_cap) for k in ("x0", "y0", "dx", "dy", "start", "end")}
+        self._petal_n = 0
+
+        # animation states
+        self._grad_phase = 0.0
+        self._wave_phase = 0.0
+        self._fade_anim = None
+        # waveform rendered into a numpy-backed QImage and blitted in one
+        # drawImage; allocated lazily because it tracks the widget width
+        self._wave_img = None
+        self._wave_buf = None
+        # packed-ARGB palette for the waveform bars, indexed [hue, alpha>>5]
+        self._build_hue_lut()
+        # border gradient colors over one phase cycle
+        self._build_border_ring()
+        # invariant paint objects; building these per frame churned the
+        # allocator at the gradient timer rate
+        self._base_color = QColor(8, 8, 10, 220)
+        self._inner_glow_brush = QBrush(QColor(255, 255, 255, 8))
+        self._petal_color = QColor(255, 190, 170)
+        self._title_font = QFont("Montserrat", 30, QFont.Bold)
+        self._glow_fonts = [QFont("Montserrat", 30 + i, QFont.Bold) for i in range(1, 5)]
+        self._bg_path = QPainterPath()
+        self._bg_path.addRoundedRect(0, 0, self.width(), self.height(), 20, 20)
+        # one pre-rendered background pixmap per border-ring phase step
+        self._bg_frames: list = [None] * 64
+        # title glow rendered once per (speaking, intensity) combo; the
+        # 5-pass font construction + text shaping was per frame before
+        self._title_cache: dict = {}
+
+        # timers
+        # one frame timer instead of separate gradient/wave timers: half the
+        # wakeups, and the top band only repaints when its pre-rendered
+        # background frame (or a live petal) actually changes
+        self._frame_timer = QTimer(self)
+        self._frame_timer.timeout.connect(self._frame_tick)
+        self._frame_timer.start(16)
+        self._last_bg_idx = -1
+
+        # typewriter state (started on demand by _type_animate_response)
+        self._type_timer = QTimer(self)
+        self._type_timer.timeout.connect(self._type_step)
+        self._type_text = ""
+        self._type_idx = 0
+
+        # dragging/docking
+        self._drag_pos = None
+
+        # screen geometry is a Qt round-trip; cache it and follow changes
+        screen = QApplication.primaryScreen()
+        self._screen_geom = screen.availableGeometry()
+        screen.availableGeometryChanged.connect(
+            lambda geom: setattr(self, "_screen_geom", geom))
+
+        # start mic listener (with optional forced index)
+        self._start_background_listener(self.forced_mic_index)
+
+        # greeting after show (animated)
+        QTimer.singleShot(700, self._greet)
+
+        # fade-in
+        self.setWindowOpacity(0.0)
+        self._animate_show()
+
+        # drop shadow
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(18)
+        shadow.setOffset(0, 6)
+        shadow.setColor(QColor(0, 0, 0, 160))
+        self.setGraphicsEffect(shadow)
+
+    # UI helpers
+    def _btn_style(self, color_hex: str) -> str:
+        return f"""
+            background-color: {color_hex};
+            border-radius: 7px;
+            border: 1px solid rgba(255,255,255,0.06);
+        """
+
+    def _build_peach_rose_icon(self, size_px: int) -> QPixmap:
+        pix = QPixmap(size_px, size_px)
+        pix.fill(Qt.transparent)
+        p = QPainter(pix)
+        p.setRenderHint(QPainter.Antialiasing)
+        center = size_px / 2
+        petal_color = QColor(255, 179, 153)
+        stroke = QColor(210, 120, 100)
+        p.setBrush(petal_color)
+        p.setPen(stroke)
+        for i in range(5):
+            angle = i * (360 / 5)
+            rad = math.radians(angle)
+            x = center + math.cos(rad) * (size_px * 0.12)
+            y = center + math.sin(rad) * (size_px * 0.12)
+            rect = QRect(int(x - size_px * 0.22), int(y - size_px * 0.22),
+                         int(size_px * 0.44), int(size_px * 0.44))
+            p.drawEllipse(rect)
+        p.setBrush(QColor(255, 140, 120))
+        p.drawEllipse(int(center - size_px * 0.12), int(center - size_px * 0.12),
+                      int(size_px * 0.24), int(size_px * 0.24))
+        p.end()
+        return pix
+
+    # Greeting
+    def _greet(self):
+        greeting = "Hi, I'm Rose, your healer. How can I assist you?"
+        self._type_animate_response(greeting)
+        # spawn petals + speak (pre-warm)
+        self._trigger_speaking_effects(greeting)
+        speak(greeting)
+
+    def _type_animate_response(self, text: str, interval_ms: int = 28):
+        # typewriter effect driven by a UI-thread timer — no worker thread,
+        # no per-character cross-thread singleShot posts
+        self.response_label.setText("")
+        self._type_text = text
+        self._type_idx = 0
+        self._type_timer.start(interval_ms)
+
+    def _type_step(self):
+        self._type_idx += 1
+        self.response_label.setText(self._type_text[:self._type_idx])
+        if self._type_idx >= len(self._type_text):
+            self._type_timer.stop()
+
+    def update_response(self, text: str):
+        # immediate update (no typing)
+        self.response_label.setText(text)
+
+    # Animations
+    def _animate_show(self):
+        anim = QPropertyAnimation(self, b"windowOpacity")
+        anim.setDuration(420)
+        anim.setStartValue(0.0)
+        anim.setEndValue(1.0)
+        anim.setEasingCurve(QEasingCurve.InOutCubic)
+        anim.start()
+        self._fade_anim = anim
+
+    def _animate_close(self):
+        anim = QPropertyAnimation(self, b"windowOpacity")
+        anim.setDuration(340)
+        anim.setStartValue(self.windowOpacity())
+        anim.setEndValue(0.0)
+        anim.setEasingCurve(QEasingCurve.InOutCubic)
+        def do_close():
+            global BG_LISTENER_STOP
+            if BG_LISTENER_STOP:
+                try:
+                    BG_LISTENER_STOP(wait_for_stop=False)
+                except Exception:
+                    pass
+            self.close()
+        anim.finished.connect(do_close)
+        anim.start()
+        self._fade_anim = anim
+
+    def _animate_minimize(self):
+        anim = QPropertyAnimation(self, b"windowOpacity")
+        anim.setDuration(300)
+        anim.setStartValue(self.windowOpacity())
+        anim.setEndValue(0.0)
+        anim.setEasingCurve(QEasingCurve.InOutCubic)
+        def do_min():
+            self.showMinimized()
+            self.setWindowOpacity(0.0)
+            # a minimized HUD shouldn't keep burning paint cycles
+            self._stop_anim_timers()
+        anim.finished.connect(do_min)
+        anim.start()
+        self._fade_anim = anim
+
+    def toggle_max_restore(self):
+        if self.isMaximized():
+            self.showNormal()
+        else:
+            self.showMaximized()
+
+    def _frame_tick(self):
+        # phase steps scaled from the old 30/36 ms intervals to 16 ms
+        self._wave_phase += 0.085 * (0.8 + 0.4 * self.waveform_sensitivity)
+        if self._wave_phase > math.tau:
+            self._wave_phase -= math.tau
+        self.update(QRect(20, self.height() - 110, self.width() - 40, 100))
+
+        self._grad_phase += 0.0031 * (0.5 + 0.5 * self.theme_intensity)
+        if self._grad_phase > math.tau:
+            self._grad_phase -= math.tau
+        idx = int(self._grad_phase * 64 / math.tau) % 64
+        if idx != self._last_bg_idx or self._petal_n:
+            self._last_bg_idx = idx
+            # border + title band + petal fall zone; the icon invalidates
+            # its own smaller rect at its own rate
+            self.update(QRect(0, 0, self.width(), 160))
+
+    def _icon_tick(self):
+        self.icon_angle = (self.icon_angle + 0.7) % 360
+        # rotated frames overhang the nominal icon box; pad the dirty rect
+        self.update(QRect(self.icon_x - 10, self.icon_y - 10, 60, 60))
+
+    def paintEvent(self, ev: QPaintEvent):
+        # nothing to show while faded out or minimized; skip the whole pass
+        if self.isMinimized() or self.windowOpacity() < 0.02:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        w, h = self.width(), self.height()
+        self._paint_background(painter, w, h)
+
+        # icon, title and waveform only redraw when the dirty region
+        # actually touches them (each tick invalidates its own rect)
+        icon_rect = QRect(self.icon_x - 10, self.icon_y - 10, 60, 60)
+        if ev.rect().intersects(icon_rect):
+            self._paint_icon(painter)
+
+        speaking = TTS_EVENT.is_set()
+        if ev.rect().intersects(self.title_label.geometry()):
+            painter.drawPixmap(self.title_label.geometry().topLeft(), self._title_pixmap(speaking))
+
+        wave_rect = QRect(20, h - 130, w - 40, 120)
+        if ev.rect().intersects(wave_rect):
+            self._draw_waveform(painter, speaking)
+
+        # petals
+        self._draw_petals(painter)
+
+    def _paint_background(self, painter: QPainter, w: int, h: int):
+        # the whole background layer is pre-rasterized per gradient phase;
+        # frames render lazily on first hit and then blit forever
+        idx = int(self._grad_phase * 64 / math.tau) % 64
+        frame = self._bg_frames[idx]
+        if frame is None:
+            frame = self._render_bg_frame(idx, w, h)
+            self._bg_frames[idx] = frame
+        painter.drawPixmap(0, 0, frame)
+
+    def _render_bg_frame(self, idx: int, w: int, h: int) -> QPixmap:
+        pix = QPixmap(w, h)
+        pix.fill(Qt.transparent)
+        painter = QPainter(pix)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # matte black base (path rebuilt on resize, not per frame)
+        painter.fillPath(self._bg_path, self._base_color)
+
+        # frosted glass overlay simulation
+        painter.fillPath(self._bg_path, self._frost_color)
+
+        # animated neon border (purple->pink->blue); colors come from the
+        # precomputed phase ring, no HSV conversion per paint
+        c1, c2 = self._border_ring[idx]
+        border_grad = QLinearGradient(0, 0, w, 0)
+        border_grad.setColorAt(0.0, c1)
+        border_grad.setColorAt(0.5, c2)
+        border_grad.setColorAt(1.0, c1)
+        pen = painter.pen()
+        pen.setWidth(2)
+        pen.setBrush(border_grad)
+        painter.setPen(pen)
+        painter.drawRoundedRect(1, 1, w - 2, h - 2, 20, 20)
+
+        # inner subtle glow
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self._inner_glow_brush)
+        painter.drawRoundedRect(10, 10, w - 20, h - 20, 16, 16)
+
+        # neon corner accents
+        accent_size = 12
+        corner_grad = QLinearGradient(0, 0, accent_size, accent_size)
+        corner_grad.setColorAt(0.0, c1)
+        corner_grad.setColorAt(1.0, c2)
+        painter.setBrush(corner_grad)
+        painter.drawEllipse(6, 6, 8, 8)  # top-left tiny
+        painter.end()
+        return pix
+
+    def _paint_icon(self, painter: QPainter):
+        # rotating peach icon from the pre-rotated frame cache
+        # (frames have rotation-dependent bounding boxes, so keep centered)
+        frame = self.icon_frames[int(self.icon_angle // 10) % 36]
+        painter.drawPixmap(self.icon_x + (self.icon_pix.width() - frame.width()) // 2,
+                           self.icon_y + (self.icon_pix.height() - frame.height()) // 2,
+                           frame)
+
+    def _title_pixmap(self, speaking: bool) -> QPixmap:
+        """Glow stack + crisp title rendered once per state, then blitted."""
+        key = (speaking, round(self.theme_intensity, 1), self.width())
+        pix = self._title_cache.get(key)
+        if pix is not None:
+            return pix
+        if len(self._title_cache) > 16:
+            self._title_cache.clear()  # resizing can mint many width keys
+        rect = self.title_label.geometry()
+        pix = QPixmap(rect.size())
+        pix.fill(Qt.transparent)
+        p = QPainter(pix)
+        p.setRenderHint(QPainter.Antialiasing)
+        base_col = QColor(255, 190, 180) if speaking else QColor(190, 0, 255)
+        target = QRect(0, 0, rect.width(), rect.height())
+        text = self.title_label.text()
+        for i in range(4, 0, -1):
+            alpha = max(6, 36 // i)
+            p.setPen(QColor(base_col.red(), base_col.green(), base_col.blue(), alpha))
+            p.setFont(self._glow_fonts[i - 1])
+            p.drawText(target, Qt.AlignCenter, text)
+        p.setPen(QColor(255, 255, 255))
+        p.setFont(self._title_font)
+        p.drawText(target, Qt.AlignCenter, text)
+        p.end()
+        self._title_cache[key] = pix
+        return pix
+
+    def _build_border_ring(self):
+        """Bake 64 border color pairs spanning one gradient phase cycle."""
+        # the frost overlay alpha bakes in theme intensity too
+        self._frost_color = QColor(255, 255, 255, int(6 * (0.6 + 0.4 * self.theme_intensity)))
+        self._border_ring = [
+            (QColor.fromHsv(int((270 + math.sin(p) * 12) % 360), int(180 * self.theme_intensity), 200),
+             QColor.fromHsv(int((320 + math.cos(p * 1.2) * 12) % 360), int(200 * self.theme_intensity), 210))
+            for p in np.linspace(0, math.tau, 64, endpoint=False)
+        ]
+
+    def _build_hue_lut(self):
+        """Bake the bar palette to packed premultiplied ARGB, [hue, alpha>>5]."""
+        sat = int(180 * self.theme_intensity)
+        lut = np.zeros((360, 8), dtype=np.uint32)
+        for hdeg in range(360):
+            r, g, b, _ = QColor.fromHsv(hdeg, sat, 230).getRgb()
+            for ai in range(8):
+                a = ai * 32 + 16
+                lut[hdeg, ai] = ((a << 24) | ((r * a // 255) << 16)
+                                 | ((g * a // 255) << 8) | (b * a // 255))
+        self._hue_lut = lut
+
+    def _ensure_wave_img(self, w: int, h: int):
+        """(Re)allocate the waveform image and its numpy view when the size changes."""
+        if self._wave_img is None or self._wave_img.width() != w or self._wave_img.height() != h:
+            self._wave_img = QImage(w, h, QImage.Format_ARGB32_Premultiplied)
+            # rows can be padded, so reshape on bytesPerLine and slice to w
+            stride = self._wave_img.bytesPerLine() // 4
+            self._wave_buf = np.frombuffer(self._wave_img.bits(), dtype=np.uint32).reshape(h, stride)[:, :w]
+            # bar x-positions and width only depend on the widget width;
+            # bake them alongside the image instead of per frame
+            bar_count = max(8, int(w / 26))
+            spacing = (w - 60) / bar_count
+            i = np.arange(bar_count, dtype=np.float32)
+            self._bar_xs = (30 + i * spacing + spacing * 0.12).astype(np.intp)
+            self._bar_w = int(spacing * 0.72)
+            self._bar_count = bar_count
+
+    def _draw_waveform(self, painter: QPainter, active: bool):
+        self._ensure_wave_img(self.width(), 68)
+        bar_count = self._bar_count
+        rect_h = 68 if active else 36
+        y0 = self.height() - 120 if active else self.height() - 90
+        # amplitude/hue math lives in the (optionally JITed) kernel module;
+        # the bars are filled straight into a numpy-backed image and blitted once
+        amp, hues_f = wave_bars(self._wave_phase, self._grad_phase, bar_count,
+                                self.waveform_sensitivity, active)
+        # over-unity amps (sensitivity boost) must clamp: a negative slice start
+        # wraps around the buffer and draws the tallest bars as bottom slivers
+        np.minimum(amp, 1.0, out=amp)
+        alphas = (110 + 80 * amp).astype(np.intp) if active else (60 + 40 * amp).astype(np.intp)
+        hue_idx = hues_f.astype(np.intp) % 360
+        alpha_idx = np.clip(alphas >> 5, 0, 7)
+        packed = self._hue_lut[hue_idx, alpha_idx]  # no QColor work per frame
+        bar_hs = (rect_h * amp).astype(np.intp)
+        bys = ((rect_h - rect_h * amp) / 2).astype(np.intp)
+        bxs = self._bar_xs
+        bw = self._bar_w
+        buf = self._wave_buf
+        buf[:] = 0
+        for k in range(bar_count):
+            buf[bys[k]:bys[k] + bar_hs[k], bxs[k]:bxs[k] + bw] = packed[k]
+        painter.drawImage(0, y0, self._wave_img)
+
+    def _draw_petals(self, painter: QPainter):
+        n = self._petal_n
+        if n == 0:
+            return
+        now = time.time()
+        alive = self.petals["end"][:n] > now
+        if not alive.all():
+            # compact live petals to the front of the capacity arrays
+            m = int(alive.sum())
+            for k in self.petals:
+                self.petals[k][:m] = self.petals[k][:n][alive]
+            self._petal_n = n = m
+            if n == 0:
+                return
+        xs, ys, alphas_f, sizes_f = petal_step(
+            self.petals["x0"][:n], self.petals["y0"][:n], self.petals["dx"][:n],
+            self.petals["dy"][:n], self.petals["start"][:n], self.petals["end"][:n], now)
+        alphas = alphas_f.astype(np.intp)
+        sizes = sizes_f.astype(np.intp)
+        painter.setPen(Qt.NoPen)
+        petal_color = self._petal_color  # one shared color, alpha mutated per petal
+        for k in range(xs.size):
+            petal_color.setAlpha(int(alphas[k]))
+            painter.setBrush(petal_color)
+            painter.drawEllipse(int(xs[k]), int(ys[k]), int(sizes[k]), int(sizes[k]))
+
+    def _trigger_speaking_effects(self, text: str):
+        now = time.time()
+        # overlapping speak() calls would stack petal bursts; cap at 10/s
+        if now - self._last_effect_ts < 0.1:
+            return
+        self._last_effect_ts = now
+        cnt = min(12, max(6, len(text.split()) // 3))
+        n = self._petal_n
+        cnt = min(cnt, self._petal_cap - n)  # drop overflow rather than grow
+        if cnt <= 0:
+            return
+        i = np.arange(cnt)
+        new = {
+            "x0": self.icon_x + np.random.randint(-6, 19, cnt).astype(float),
+            "y0": self.icon_y + np.random.randint(6, 19, cnt).astype(float),
+            "dx": np.random.uniform(-26, 26, cnt),
+            "dy": np.random.uniform(40, 96, cnt),
+            "start": now + np.random.uniform(0.0, 0.06, cnt) * i,
+            "end": now + 0.9 + i * 0.05,
+        }
+        for k in self.petals:
+            self.petals[k][n:n + cnt] = new[k]
+        self._petal_n = n + cnt
+
+    # --------------- Microphone management ---------------
+    def _start_background_listener(self, forced_index: Optional[int] = None):
+        available = _get_mic_names()
+        mic_index = None
+
+        if forced_index is not None and 0 <= forced_index < len(available):
+            mic_index = forced_index
+            print("Forced mic index selected:", mic_index, available[mic_index])
+        else:
+            # prefer non-virtual devices; probing with a 0.6s ambient-noise
+            # pass per candidate blocked startup for seconds, so ask
+            # PortAudio whether the format works instead (no capture at all)
+            try:
+                import pyaudio
+                pa = pyaudio.PyAudio()
+            except Exception:
+                pa = None
+            bad_keywords = ("Sound Mapper", "Microsoft Sound Mapper", "Primary Sound Driver", "Stereo Mix")
+            candidates = [i for i, name in enumerate(available)
+                          if not any(bk in name for bk in bad_keywords)]
+
+            def probe(i):
+                try:
+                    if pa is not None:
+                        pa.is_format_supported(16000, input_device=i, input_channels=1,
+                                               input_format=pyaudio.paInt16)
+                    else:
+                        with sr.Microphone(device_index=i):
+                            pass
+                    return i
+                except Exception:
+                    return None
+
+            # probe devices concurrently; map keeps device order so the
+            # usual "first workable mic" preference still holds
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                for i in ex.map(probe, candidates):
+                    if i is not None:
+                        mic_index = i
+                        print("Auto-selected mic:", available[i])
+                        break
+            if pa is not None:
+                pa.terminate()
+            if mic_index is None and available:
+                mic_index = 0
+                print("Falling back to mic:", available[0])
+
+        if mic_index is None:
+            print("No microphone found")
+            self.update_response("No microphone found")
+            return
+
+        mic = sr.Microphone(device_index=mic_index)
+        self.current_mic_index = mic_index
+
+        def callback(recognizer_obj, audio):
+            if TTS_EVENT.is_set():
+                return
+            # clips queue to the shared ASR worker: a burst of short phrases
+            # is drained back-to-back on one thread instead of fanning out a
+            # recognizer call + dispatch thread apiece, and replies stay
+            # in utterance order
+            _ASR_QUEUE.put((recognizer_obj, audio, self))
+
+        global BG_LISTENER_STOP
+        try:
+            rec = sr.Recognizer()
+            BG_LISTENER_STOP = rec.listen_in_background(mic, callback, phrase_time_limit=4)
+            print("Started background listener on index", mic_index)
+        except Exception as e:
+            print("listen_in_background failed:", e)
+            # fallback to blocking in thread
+            threading.Thread(target=self._fallback_listen_loop, args=(mic,), daemon=True).start()
+
+    def _fallback_listen_loop(self, mic):
+        if VOSK_AVAILABLE:
+            # decode while recording instead of capture-then-post
+            self._streaming_listen_loop(mic)
+            return
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = True
+        r.pause_threshold = 0.35
+        while LISTENING:
+            try:
+                # one stream for the whole session: reopening PortAudio and
+                # re-running 0.6s of ambient calibration per command added
+                # most of a second to every cycle. Calibrate once; the
+                # dynamic threshold keeps adapting from there. Recognition
+                # happens on the ASR worker, so capture never stalls on it.
+                with mic as source:
+                    r.adjust_for_ambient_noise(source, duration=0.6)
+                    while LISTENING:
+                        audio = r.listen(source, phrase_time_limit=5)
+                        _ASR_QUEUE.put((r, audio, self))
+            except Exception as e:
+                print("Mic capture error:", e)
+                time.sleep(0.2)
+
+    def _streaming_listen_loop(self, mic):
+        """Feed mic frames straight into vosk as they arrive.
+
+        r.listen() + recognize serialized capture and decoding; here the
+        recognizer chews each frame while the next is recorded, and its
+        endpointer closes the utterance, so results land as speech stops.
+        """
+        while LISTENING:
+            try:
+                with mic as source:
+                    rec = vosk.KaldiRecognizer(_get_vosk_model(), source.SAMPLE_RATE)
+                    while LISTENING:
+                        frame = source.stream.read(source.CHUNK)
+                        if TTS_EVENT.is_set():
+                            continue  # keep draining, but don't hear ourselves
+                        if rec.AcceptWaveform(frame):
+                            text = json.loads(rec.Result()).get("text", "")
+                            if text.strip():
+                                threading.Thread(target=handle_command, args=(text, self), daemon=True).start()
+            except Exception as e:
+                print("Streaming ASR error:", e)
+                time.sleep(0.5)
+
+    def reselect_mic_dialog(self):
+        # show mic list and let user pick
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Select Microphone")
+        layout = QVBoxLayout()
+        combo = QComboBox()
+
+        def fill(mics):
+            combo.clear()
+            combo.addItem("Auto-detect")
+            for m in mics:
+                combo.addItem(m)
+
+        fill(_get_mic_names())
+        btns = QHBoxLayout()
+        ok = QPushButton("OK")
+        cancel = QPushButton("Cancel")
+        refresh = QPushButton("↻")
+        refresh.setToolTip("Re-scan audio devices")
+        refresh.setFixedWidth(28)
+        # only an explicit refresh pays the PortAudio re-enumeration cost
+        refresh.clicked.connect(lambda: fill(_get_mic_names(force=True)))
+        row = QHBoxLayout()
+        row.addWidget(combo); row.addWidget(refresh)
+        layout.addLayout(row)
+        btns.addWidget(ok); btns.addWidget(cancel)
+        layout.addLayout(btns)
+        dlg.setLayout(layout)
+        def do_ok():
+            idx = combo.currentIndex()
+            if idx == 0:
+                self.forced_mic_index = None
+            else:
+                self.forced_mic_index = idx - 1
+            # restart listener
+            self._restart_listener()
+            dlg.accept()
+        ok.clicked.connect(do_ok)
+        cancel.clicked.connect(dlg.reject)
+        dlg.exec()
+
+    def _restart_listener(self):
+        global BG_LISTENER_STOP
+        try:
+            if BG_LISTENER_STOP:
+                BG_LISTENER_STOP(wait_for_stop=False)
+        except Exception:
+            pass
+        time.sleep(0.12)
+        self._start_background_listener(self.forced_mic_index)
+
+    # ---------------- Docking/snapping & input events ----------------
+    def _snap_to_edge_if_close(self):
+        screen = self._screen_geom
+        px, py = self.pos().x(), self.pos().y()
+        w, h = self.width(), self.height()
+        if abs(px - screen.x()) < DOCK_THRESHOLD:
+            self.move(screen.x(), py)
+        if abs((px + w) - (screen.x() + screen.width())) < DOCK_THRESHOLD:
+            self.move(screen.x() + screen.width() - w, py)
+        if abs(py - screen.y()) < DOCK_THRESHOLD:
+            self.move(self.pos().x(), screen.y())
+        if abs((py + h) - (screen.y() + screen.height())) < DOCK_THRESHOLD:
+            self.move(self.pos().x(), screen.y() + screen.height() - h)
+
+    def mousePressEvent(self, ev):
+        if ev.button() == Qt.LeftButton:
+            self._drag_pos = ev.globalPosition().toPoint() - self.frameGeometry().topLeft()
+            ev.accept()
+
+    def mouseMoveEvent(self, ev):
+        if self._drag_pos is not None and ev.buttons() & Qt.LeftButton:
+            target = ev.globalPosition().toPoint() - self._drag_pos
+            if target != self.pos():  # mouse polls faster than we move
+                self.move(target)
+            ev.accept()
+
+    def mouseReleaseEvent(self, ev):
+        self._snap_to_edge_if_close()
+        self._drag_pos = None
+        ev.accept()
+
+    def _stop_anim_timers(self):
+        self._frame_timer.stop()
+        self._icon_timer.stop()
+
+    def _start_anim_timers(self):
+        if not self._frame_timer.isActive():
+            self._frame_timer.start(16)
+            self._icon_timer.start(80)
+
+    def showEvent(self, ev):
+        # restart animation timers after a restore from minimized
+        self._start_anim_timers()
+        QWidget.showEvent(self, ev)
+
+    def hideEvent(self, ev):
+        # nothing to animate while hidden
+        self._stop_anim_timers()
+        QWidget.hideEvent(self, ev)
+
+    def changeEvent(self, ev):
+        # minimize can happen without our fade animation (e.g. taskbar click)
+        if ev.type() == QEvent.WindowStateChange:
+            if self.windowState() & Qt.WindowMinimized:
+                self._stop_anim_timers()
+            else:
+                self._start_anim_timers()
+        QWidget.changeEvent(self, ev)
+
+    def resizeEvent(self, ev):
+        self.title_label.setGeometry(0, 40, self.width(), 54)
+        self.response_label.setGeometry(20, 140, self.width() - 40, 100)
+        self.settings_btn.setGeometry(self.width() - 40, 8, 32, 20)
+        self.mic_btn.setGeometry(self.width() - 84, 8, 36, 20)
+        self._wave_img = None  # width changed; _draw_waveform reallocates
+        self._bg_path = QPainterPath()
+        self._bg_path.addRoundedRect(0, 0, self.width(), self.height(), 20, 20)
+        self._bg_frames = [None] * 64  # frames are size-dependent
+        QWidget.resizeEvent(self, ev)
+
+    def closeEvent(self, ev):
+        global LISTENING, BG_LISTENER_STOP
+        LISTENING = False
+        if BG_LISTENER_STOP:
+            try:
+                BG_LISTENER_STOP(wait_for_stop=False)
+            except Exception:
+                pass
+        _stop_mpv()
+        time.sleep(0.12)
+        ev.accept()
+
+    # ---------------- Settings UI ----------------
+    def open_settings(self):
+        dlg = SettingsDialog(self)
+        if dlg.exec():
+            # user saved - apply settings (already done in dialog)
+            self.update_response("Settings saved")
+            # restart mic if forced changed
+            self._restart_listener()
+
+# ---------------- Main ----------------
+def main():
+    app = QApplication(sys.argv)
+    hud = NeonHUD()
+    hud.show()
+
+    # pre-warm TTS quietly so first speak is snappy (optional)
+    prewarm_tts()
+    QTimer.singleShot(1000, lambda: speak("Ready"))
+
+    sys.exit(app.exec())
+
+if __name__ == "__main__":
+    main()
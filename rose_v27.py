@@ -1,229 +1,385 @@
-# rose_v27_fixed.py
-# Rose Assistant with Clean HUD (no HTML buttons, fixed text, open apps restored)
-
-import sys, os, time, json, asyncio, threading, platform, subprocess, webbrowser, requests
-from typing import Optional
-from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint
-from PySide6.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QMenu
-from PySide6.QtGui import QFont, QPixmap
-from PySide6.QtWebEngineWidgets import QWebEngineView
-
-import speech_recognition as sr
-import edge_tts
-from pytube import Search
-
-# ---------------- Globals ----------------
-LISTENING = True
-TTS_PLAYING = False
-TTS_LOCK = threading.Lock()
-BG_LISTENER_STOP = None
-CONVERSATION_HISTORY = []
-REMINDERS = []
-
-HISTORY_FILE = "rose_history.json"
-REMINDERS_FILE = "rose_reminders.json"
-
-# API keys
-GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
-OPENWEATHER_API_KEY = "YOUR_OPENWEATHER_API_KEY"
-NEWSAPI_API_KEY = "YOUR_NEWSAPI_API_KEY"
-
-# ---------------- Persistence ----------------
-def load_persistent_data():
-    global CONVERSATION_HISTORY, REMINDERS
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'r') as f: CONVERSATION_HISTORY = json.load(f)
-    if os.path.exists(REMINDERS_FILE):
-        with open(REMINDERS_FILE, 'r') as f: REMINDERS = json.load(f)
-
-def save_persistent_data():
-    with open(HISTORY_FILE, 'w') as f: json.dump(CONVERSATION_HISTORY, f)
-    with open(REMINDERS_FILE, 'w') as f: json.dump(REMINDERS, f)
-
-# ---------------- TTS ----------------
-def _estimate_tts_duration_seconds(text: str) -> float:
-    return max(0.6, len(text.split()) / 2.8)
-
-async def _gen_tts_save(text: str, filename: str = "speech.mp3"):
-    comm = edge_tts.Communicate(text, "en-US-JennyNeural")
-    await comm.save(filename)
-
-def _play_audio_file(path: str):
-    try:
-        if platform.system()=="Windows": subprocess.Popen(["start", path], shell=True)
-        elif platform.system()=="Darwin": subprocess.Popen(["afplay", path])
-        else: subprocess.Popen(["xdg-open", path])
-    except Exception as e: print("Playback error:", e)
-
-def speak(text: str):
-    def runner():
-        global TTS_PLAYING
-        with TTS_LOCK: TTS_PLAYING = True
-        try:
-            asyncio.run(_gen_tts_save(text, "speech.mp3"))
-            _play_audio_file("speech.mp3")
-            time.sleep(_estimate_tts_duration_seconds(text) + 0.35)
-        finally:
-            with TTS_LOCK: TTS_PLAYING = False
-    threading.Thread(target=runner, daemon=True).start()
-
-# ---------------- Helpers ----------------
-def play_youtube_song(song: str):
-    try:
-        if not song: return webbrowser.open("https://www.youtube.com")
-        s = Search(song)
-        if not getattr(s,"results",None):
-            return webbrowser.open(f"https://www.youtube.com/results?search_query={song.replace(' ','+')}")
-        first = s.results[0]
-        url = getattr(first,"watch_url",None) or f"https://www.youtube.com/watch?v={first.video_id}"
-        webbrowser.open(url)
-    except: webbrowser.open(f"https://www.youtube.com/results?search_query={song.replace(' ','+')}")
-
-def get_weather(city: str):
-    try:
-        r = requests.get(f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric").json()
-        if r.get("cod")!=200: return "Sorry, couldn't fetch weather."
-        return f"The weather in {city} is {r['weather'][0]['description']} with {r['main']['temp']}°C."
-    except: return "Weather service failed."
-
-def get_news():
-    try:
-        r = requests.get(f"https://newsapi.org/v2/top-headlines?country=us&apiKey={NEWSAPI_API_KEY}").json()
-        if r.get("status")!="ok": return "Couldn't fetch news."
-        return "Top: " + " ".join(f"{a['title']}." for a in r['articles'][:3])
-    except: return "News service failed."
-
-def handle_reminder(cmd_norm: str):
-    global REMINDERS
-    if "remind me to" in cmd_norm:
-        task=cmd_norm.split("remind me to")[-1].strip()
-        REMINDERS.append(task); save_persistent_data()
-        return f"Reminder added: {task}"
-    elif "what are my reminders" in cmd_norm:
-        return "Your reminders: " + "; ".join(REMINDERS) if REMINDERS else "You have no reminders."
-    return None
-
-# ---------------- HUD ----------------
-class RoseHUD(QWidget):
-    def __init__(self):
-        super().__init__()
-        load_persistent_data()
-        self.setWindowFlags(Qt.FramelessWindowHint|Qt.WindowStaysOnTopHint|Qt.Tool)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.resize(600,400)
-        self.drag_pos=None
-        self.setup_ui(); self._start_background_listener()
-
-    def setup_ui(self):
-        # HTML background (stripped buttons)
-        self.web_bg=QWebEngineView(self)
-        html_path=os.path.abspath("gradient_circle_design.html")
-        with open(html_path,"r",encoding="utf-8") as f:
-            html=f.read().replace('<div class="top-controls">','<div style="display:none">')  # hide html buttons
-        self.web_bg.setHtml(html)
-        self.web_bg.setGeometry(0,0,self.width(),self.height())
-        self.web_bg.setAttribute(Qt.WA_TransparentForMouseEvents)
-
-        # Rose logo beside buttons
-        self.rose_icon=QLabel(self)
-        self.rose_icon.setPixmap(QPixmap(32,32))
-        self.rose_icon.setStyleSheet("background: transparent;")
-        self.rose_icon.setGeometry(65,12,24,24)
-
-        # Title + response
-        self.title_label=QLabel("ROSE",self)
-        self.title_label.setFont(QFont("Segoe UI",28,QFont.Bold))
-        self.title_label.setStyleSheet("color: white;")
-        self.title_label.setGeometry(0,40,self.width(),50)
-        self.title_label.setAlignment(Qt.AlignCenter)
-
-        self.response_label=QLabel("Hello, I'm Rose.",self)
-        self.response_label.setFont(QFont("Segoe UI",14))
-        self.response_label.setStyleSheet("color: white;")
-        self.response_label.setGeometry(40,300,self.width()-80,80)
-        self.response_label.setAlignment(Qt.AlignCenter)
-        self.response_label.setWordWrap(True)
-
-        # Mac-style buttons
-        self.close_btn=QPushButton(self)
-        self.close_btn.setGeometry(15,15,18,18)
-        self.close_btn.setStyleSheet("background:#FF5C5C; border-radius:9px;")
-        self.close_btn.clicked.connect(self.close)
-
-        self.min_btn=QPushButton(self)
-        self.min_btn.setGeometry(40,15,18,18)
-        self.min_btn.setStyleSheet("background:#FFBD44; border-radius:9px;")
-        self.min_btn.clicked.connect(self.showMinimized)
-
-        # Menu button
-        self.menu_btn=QPushButton("☰",self)
-        self.menu_btn.setGeometry(self.width()-50,15,30,30)
-        self.menu_btn.setStyleSheet("QPushButton{background:rgba(255,255,255,0.2);border-radius:8px;color:white;} QPushButton:hover{background:rgba(255,255,255,0.3);}")
-        self.menu=QMenu(self)
-        self.menu.addAction("Toggle Flow", lambda:self.inject_js("toggleAnimation()"))
-        self.menu.addAction("Change Speed", lambda:self.inject_js("changeSpeed()"))
-        self.menu.addAction("Toggle Glow", lambda:self.inject_js("toggleGlow()"))
-        self.menu_btn.setMenu(self.menu)
-
-        QTimer.singleShot(900,self._greet)
-
-    def inject_js(self,script): self.web_bg.page().runJavaScript(script)
-    def _greet(self): self.update_response("Hi, I'm Rose. How can I help you?"); speak("Hi, I'm Rose. How can I help you?")
-    def update_response(self,text): self.response_label.setText(text)
-
-    # Drag & snap
-    def mousePressEvent(self,e): 
-        if e.button()==Qt.LeftButton: self.drag_pos=e.globalPosition().toPoint()-self.frameGeometry().topLeft()
-    def mouseMoveEvent(self,e):
-        if self.drag_pos and e.buttons()&Qt.LeftButton: self.move(e.globalPosition().toPoint()-self.drag_pos)
-
-    # Mic
-    def _start_background_listener(self):
-        rec=sr.Recognizer(); mics=sr.Microphone.list_microphone_names()
-        mic_index=0 if mics else None
-        if mic_index is None: return
-        mic=sr.Microphone(device_index=mic_index)
-        def callback(r,a):
-            with TTS_LOCK:
-                if TTS_PLAYING: return
-            try:
-                t=r.recognize_google(a)
-                if t: threading.Thread(target=handle_command,args=(t,self),daemon=True).start()
-            except: return
-        global BG_LISTENER_STOP
-        BG_LISTENER_STOP=rec.listen_in_background(mic,callback,phrase_time_limit=4)
-
-# ---------------- Commands ----------------
-def handle_command(cmd:str,hud_ref:Optional[QWidget]=None):
-    cmd_norm=cmd.lower().strip()
-    if hud_ref: hud_ref.update_response(f"You said: {cmd_norm}")
-
-    # priority commands first
-    if "open youtube" in cmd_norm: speak("Opening YouTube"); webbrowser.open("https://youtube.com"); return
-    if "open brave" in cmd_norm: speak("Opening Brave"); os.startfile(r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe") if platform.system()=="Windows" else webbrowser.open("https://brave.com"); return
-    if "open chrome" in cmd_norm: speak("Opening Chrome"); os.startfile(r"C:\Program Files\Google\Chrome\Application\chrome.exe") if platform.system()=="Windows" else webbrowser.open("https://google.com"); return
-
-    # reminders/weather/news
-    r=handle_reminder(cmd_norm)
-    if r: speak(r); hud_ref.update_response(r); return
-    if "weather" in cmd_norm: reply=get_weather("London"); speak(reply); hud_ref.update_response(reply); return
-    if "news" in cmd_norm: reply=get_news(); speak(reply); hud_ref.update_response(reply); return
-
-    # youtube play
-    if cmd_norm.startswith("play "): song=cmd_norm.replace("play","").replace("on youtube","").strip(); speak(f"Playing {song} on YouTube"); play_youtube_song(song); return
-
-    # gemini
-    global CONVERSATION_HISTORY
-    CONVERSATION_HISTORY.append({"role":"user","parts":[{"text":cmd_norm}]})
-    try:
-        r=requests.post(f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}",json={"contents":CONVERSATION_HISTORY})
-        ai_reply=r.json()["candidates"][0]["content"]["parts"][0]["text"]
-        CONVERSATION_HISTORY.append({"role":"model","parts":[{"text":ai_reply}]})
-        save_persistent_data(); speak(ai_reply); hud_ref.update_response(ai_reply)
-    except: hud_ref.update_response("Sorry, I couldn't process that.")
-
-# ---------------- Main ----------------
-def main():
-    app=QApplication(sys.argv); hud=RoseHUD(); hud.show(); sys.exit(app.exec())
-
-if __name__=="__main__": main()
+# rose_v27_fixed.py
+# Rose Assistant with Clean HUD (no HTML buttons, fixed text, open apps restored)
+
+import sys, os, re, time, json, queue, atexit, shutil, asyncio, functools, threading, platform, subprocess, webbrowser, requests
+
+# cap BLAS/OpenMP pools before any numeric import: the realtime audio loops
+# here are tiny per-call, and spinning worker threads just steals cores from
+# the UI and TTS threads
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+from typing import Optional
+from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint
+from PySide6.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QMenu
+from PySide6.QtGui import QFont, QPixmap
+from PySide6.QtWebEngineWidgets import QWebEngineView
+
+import speech_recognition as sr
+import edge_tts
+
+try:
+    import miniaudio  # streaming MP3 decode + playback for low-latency TTS
+except ImportError:
+    miniaudio = None
+
+try:
+    import orjson  # C JSON for persistence + Gemini parse; stdlib json fallback
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # faster loop for the shared asyncio thread (POSIX only)
+except ImportError:
+    uvloop = None
+
+# ---------------- Globals ----------------
+LISTENING = True
+TTS_PLAYING = False
+TTS_LOCK = threading.Lock()
+BG_LISTENER_STOP = None
+CONVERSATION_HISTORY = []
+REMINDERS = []
+
+HISTORY_FILE = "rose_history.json"
+REMINDERS_FILE = "rose_reminders.json"
+
+# persistent HTTP session: weather/news/Gemini calls reuse pooled
+# keep-alive connections instead of a fresh TCP+TLS handshake apiece
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+# platform + executable paths resolved once at import; platform.system()
+# does a uname/registry lookup per call and these sit on the command path
+IS_WIN = sys.platform == "win32"
+IS_MAC = sys.platform == "darwin"
+BRAVE_PATH = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe" if IS_WIN else shutil.which("brave") or shutil.which("brave-browser")
+CHROME_PATH = r"C:\Program Files\Google\Chrome\Application\chrome.exe" if IS_WIN else shutil.which("google-chrome") or shutil.which("chromium")
+
+# API keys
+GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
+OPENWEATHER_API_KEY = "YOUR_OPENWEATHER_API_KEY"
+NEWSAPI_API_KEY = "YOUR_NEWSAPI_API_KEY"
+
+# ---------------- Persistence ----------------
+def load_persistent_data():
+    global CONVERSATION_HISTORY, REMINDERS
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, 'rb') as f: CONVERSATION_HISTORY = orjson.loads(f.read()) if orjson else json.load(f)
+    if os.path.exists(REMINDERS_FILE):
+        with open(REMINDERS_FILE, 'rb') as f: REMINDERS = orjson.loads(f.read()) if orjson else json.load(f)
+
+def _flush_persistent_data():
+    global _SAVE_PENDING
+    with _SAVE_LOCK: _SAVE_PENDING = False
+    try:
+        if orjson:
+            with open(HISTORY_FILE, 'wb') as f: f.write(orjson.dumps(CONVERSATION_HISTORY))
+            with open(REMINDERS_FILE, 'wb') as f: f.write(orjson.dumps(REMINDERS))
+        else:
+            with open(HISTORY_FILE, 'w') as f: json.dump(CONVERSATION_HISTORY, f)
+            with open(REMINDERS_FILE, 'w') as f: json.dump(REMINDERS, f)
+    except Exception as e: print("Save error:", e)
+
+# debounced save: bursts of turns coalesce into one write 0.5 s later, run on
+# the loop's executor so the command worker never blocks on disk
+_SAVE_PENDING = False
+_SAVE_LOCK = threading.Lock()
+def save_persistent_data():
+    global _SAVE_PENDING
+    with _SAVE_LOCK:
+        if _SAVE_PENDING: return
+        _SAVE_PENDING = True
+    TTS_LOOP.call_soon_threadsafe(
+        lambda: TTS_LOOP.call_later(0.5, lambda: TTS_LOOP.run_in_executor(None, _flush_persistent_data)))
+
+atexit.register(_flush_persistent_data)  # a pending debounce still lands on exit
+
+# ---------------- TTS ----------------
+def _estimate_tts_duration_seconds(text: str) -> float:
+    return max(0.6, len(text.split()) / 2.8)
+
+async def _gen_tts_save(text: str, filename: str = "speech.mp3"):
+    comm = edge_tts.Communicate(text, "en-US-JennyNeural")
+    await comm.save(filename)
+
+# one long-lived loop for all TTS coroutines; asyncio.run per utterance paid
+# loop startup + connection setup on every spoken line
+TTS_LOOP = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+threading.Thread(target=TTS_LOOP.run_forever, daemon=True).start()
+
+if miniaudio is not None:
+    class _TTSChunkSource(miniaudio.StreamableSource):
+        """Feeds edge-tts MP3 chunks to miniaudio's streaming decoder as they arrive."""
+        def __init__(self):
+            self._queue = queue.Queue(); self._buf = b""; self._eof = False
+        def push(self, data: bytes): self._queue.put(data)
+        def finish(self): self._queue.put(None)
+        def read(self, nbytes: int) -> bytes:
+            while len(self._buf) < nbytes and not self._eof:
+                chunk = self._queue.get()
+                if chunk is None: self._eof = True; break
+                self._buf += chunk
+            out, self._buf = self._buf[:nbytes], self._buf[nbytes:]
+            return out
+
+async def _stream_tts(text: str):
+    """Play edge-tts audio while synthesis is still running; returns at stream end."""
+    comm = edge_tts.Communicate(text, "en-US-JennyNeural")
+    source = _TTSChunkSource(); done = threading.Event()
+    device = miniaudio.PlaybackDevice(); started = False
+    try:
+        async for chunk in comm.stream():
+            if chunk["type"] != "audio": continue
+            source.push(chunk["data"])
+            if not started:
+                stream = miniaudio.stream_with_callbacks(
+                    miniaudio.stream_any(source), end_callback=done.set)
+                next(stream)  # prime before handing to the device
+                device.start(stream); started = True
+        source.finish()
+        if started:
+            # real end-of-playback signal, not a word-count estimate
+            await asyncio.get_running_loop().run_in_executor(None, done.wait)
+    finally:
+        device.close()
+
+def _play_audio_file(path: str):
+    try:
+        if IS_WIN: subprocess.Popen(["start", path], shell=True)
+        elif IS_MAC: subprocess.Popen(["afplay", path])
+        else: subprocess.Popen(["xdg-open", path])
+    except Exception as e: print("Playback error:", e)
+
+def _play_file_blocking(path: str) -> bool:
+    # returns at real end-of-stream; False when only fire-and-forget playback exists
+    try:
+        if shutil.which("ffplay"): subprocess.run(["ffplay","-nodisp","-autoexit","-loglevel","quiet",path]); return True
+        if IS_MAC: subprocess.run(["afplay",path]); return True
+    except Exception as e: print("Playback error:", e)
+    return False
+
+def speak(text: str):
+    def runner():
+        global TTS_PLAYING
+        with TTS_LOCK: TTS_PLAYING = True
+        try:
+            if miniaudio is not None:
+                # audio starts on the first synthesized chunk and the coroutine
+                # returns at actual end of playback — no sleep barrier
+                asyncio.run_coroutine_threadsafe(_stream_tts(text), TTS_LOOP).result()
+            else:
+                asyncio.run_coroutine_threadsafe(_gen_tts_save(text, "speech.mp3"), TTS_LOOP).result()
+                if not _play_file_blocking("speech.mp3"):
+                    # last resort: fire-and-forget player, word-count estimate
+                    _play_audio_file("speech.mp3")
+                    time.sleep(_estimate_tts_duration_seconds(text) + 0.35)
+        finally:
+            with TTS_LOCK: TTS_PLAYING = False
+    threading.Thread(target=runner, daemon=True).start()
+
+# ---------------- Helpers ----------------
+@functools.lru_cache(maxsize=256)
+def _resolve_watch_url(song: str) -> str:
+    # pytube scrapes a full results page (~0.5-1.5 s); import lazily and cache
+    # per title — failures raise, so lru_cache never pins a bad lookup
+    from pytube import Search
+    first = Search(song).results[0]
+    return getattr(first,"watch_url",None) or f"https://www.youtube.com/watch?v={first.video_id}"
+
+def play_youtube_song(song: str):
+    song = (song or "").lower().strip()
+    if not song: return webbrowser.open("https://www.youtube.com")
+    try: webbrowser.open(_resolve_watch_url(song))
+    except: webbrowser.open(f"https://www.youtube.com/results?search_query={song.replace(' ','+')}")
+
+# TTL cache: weather/news answers are stable for minutes, so a repeated ask
+# returns the cached line instead of another HTTPS round-trip (errors skip it)
+_API_CACHE = {}
+def _cached(key, ttl, fetch, bad):
+    hit = _API_CACHE.get(key)
+    if hit and hit[0] > time.time(): return hit[1]
+    val = fetch()
+    if val not in bad: _API_CACHE[key] = (time.time() + ttl, val)
+    return val
+
+def get_weather(city: str):
+    def fetch():
+        try:
+            r = HTTP_SESSION.get(f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric", timeout=6).json()
+            if r.get("cod")!=200: return "Sorry, couldn't fetch weather."
+            return f"The weather in {city} is {r['weather'][0]['description']} with {r['main']['temp']}°C."
+        except: return "Weather service failed."
+    return _cached(("weather", city), 600, fetch, ("Sorry, couldn't fetch weather.", "Weather service failed."))
+
+def get_news():
+    def fetch():
+        try:
+            r = HTTP_SESSION.get(f"https://newsapi.org/v2/top-headlines?country=us&apiKey={NEWSAPI_API_KEY}", timeout=6).json()
+            if r.get("status")!="ok": return "Couldn't fetch news."
+            return "Top: " + " ".join(f"{a['title']}." for a in r['articles'][:3])
+        except: return "News service failed."
+    return _cached(("news",), 300, fetch, ("Couldn't fetch news.", "News service failed."))
+
+def handle_reminder(cmd_norm: str):
+    global REMINDERS
+    if "remind me to" in cmd_norm:
+        task=cmd_norm.split("remind me to")[-1].strip()
+        REMINDERS.append(task); save_persistent_data()
+        return f"Reminder added: {task}"
+    elif "what are my reminders" in cmd_norm:
+        return "Your reminders: " + "; ".join(REMINDERS) if REMINDERS else "You have no reminders."
+    return None
+
+# ---------------- HUD ----------------
+@functools.cache
+def _get_hud_html():
+    # read + button-strip once; setup_ui runs on the UI thread before first paint
+    with open(os.path.abspath("gradient_circle_design.html"), "r", encoding="utf-8") as f:
+        return f.read().replace('<div class="top-controls">', '<div style="display:none">')
+
+class RoseHUD(QWidget):
+    def __init__(self):
+        super().__init__()
+        load_persistent_data()
+        self.setWindowFlags(Qt.FramelessWindowHint|Qt.WindowStaysOnTopHint|Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.resize(600,400)
+        self.drag_pos=None
+        self.setup_ui(); self._start_background_listener()
+
+    def setup_ui(self):
+        # HTML background (stripped buttons)
+        self.web_bg=QWebEngineView(self)
+        self.web_bg.setHtml(_get_hud_html())
+        self.web_bg.setGeometry(0,0,self.width(),self.height())
+        self.web_bg.setAttribute(Qt.WA_TransparentForMouseEvents)
+
+        # Rose logo beside buttons
+        self.rose_icon=QLabel(self)
+        self.rose_icon.setPixmap(QPixmap(32,32))
+        self.rose_icon.setStyleSheet("background: transparent;")
+        self.rose_icon.setGeometry(65,12,24,24)
+
+        # Title + response
+        self.title_label=QLabel("ROSE",self)
+        self.title_label.setFont(QFont("Segoe UI",28,QFont.Bold))
+        self.title_label.setStyleSheet("color: white;")
+        self.title_label.setGeometry(0,40,self.width(),50)
+        self.title_label.setAlignment(Qt.AlignCenter)
+
+        self.response_label=QLabel("Hello, I'm Rose.",self)
+        self.response_label.setFont(QFont("Segoe UI",14))
+        self.response_label.setStyleSheet("color: white;")
+        self.response_label.setGeometry(40,300,self.width()-80,80)
+        self.response_label.setAlignment(Qt.AlignCenter)
+        self.response_label.setWordWrap(True)
+
+        # Mac-style buttons
+        self.close_btn=QPushButton(self)
+        self.close_btn.setGeometry(15,15,18,18)
+        self.close_btn.setStyleSheet("background:#FF5C5C; border-radius:9px;")
+        self.close_btn.clicked.connect(self.close)
+
+        self.min_btn=QPushButton(self)
+        self.min_btn.setGeometry(40,15,18,18)
+        self.min_btn.setStyleSheet("background:#FFBD44; border-radius:9px;")
+        self.min_btn.clicked.connect(self.showMinimized)
+
+        # Menu button
+        self.menu_btn=QPushButton("☰",self)
+        self.menu_btn.setGeometry(self.width()-50,15,30,30)
+        self.menu_btn.setStyleSheet("QPushButton{background:rgba(255,255,255,0.2);border-radius:8px;color:white;} QPushButton:hover{background:rgba(255,255,255,0.3);}")
+        self.menu=QMenu(self)
+        self.menu.addAction("Toggle Flow", lambda:self.inject_js("toggleAnimation()"))
+        self.menu.addAction("Change Speed", lambda:self.inject_js("changeSpeed()"))
+        self.menu.addAction("Toggle Glow", lambda:self.inject_js("toggleGlow()"))
+        self.menu_btn.setMenu(self.menu)
+
+        QTimer.singleShot(900,self._greet)
+
+    def inject_js(self,script): self.web_bg.page().runJavaScript(script)
+    def _greet(self): self.update_response("Hi, I'm Rose. How can I help you?"); speak("Hi, I'm Rose. How can I help you?")
+    def update_response(self,text): self.response_label.setText(text)
+
+    # Drag & snap
+    def mousePressEvent(self,e): 
+        if e.button()==Qt.LeftButton: self.drag_pos=e.globalPosition().toPoint()-self.frameGeometry().topLeft()
+    def mouseMoveEvent(self,e):
+        if self.drag_pos and e.buttons()&Qt.LeftButton: self.move(e.globalPosition().toPoint()-self.drag_pos)
+
+    # Mic
+    def _start_background_listener(self):
+        rec=sr.Recognizer(); mics=sr.Microphone.list_microphone_names()
+        mic_index=0 if mics else None
+        if mic_index is None: return
+        mic=sr.Microphone(device_index=mic_index)
+        def callback(r,a):
+            with TTS_LOCK:
+                if TTS_PLAYING: return
+            # audio thread only enqueues: recognition runs on the worker below
+            _ASR_QUEUE.put((r,a,self))
+        global BG_LISTENER_STOP
+        BG_LISTENER_STOP=rec.listen_in_background(mic,callback,phrase_time_limit=4)
+
+# ---------------- Commands ----------------
+def _cmd_youtube(c,h): speak("Opening YouTube"); webbrowser.open("https://youtube.com")
+def _cmd_brave(c,h): speak("Opening Brave"); os.startfile(BRAVE_PATH) if IS_WIN else (subprocess.Popen([BRAVE_PATH]) if BRAVE_PATH else webbrowser.open("https://brave.com"))
+def _cmd_chrome(c,h): speak("Opening Chrome"); os.startfile(CHROME_PATH) if IS_WIN else (subprocess.Popen([CHROME_PATH]) if CHROME_PATH else webbrowser.open("https://google.com"))
+def _cmd_remind(c,h): r=handle_reminder(c); speak(r); h.update_response(r)
+def _cmd_weather(c,h): reply=get_weather("London"); speak(reply); h.update_response(reply)
+def _cmd_news(c,h): reply=get_news(); speak(reply); h.update_response(reply)
+
+# dispatch table + one compiled alternation: every keyword is matched in a
+# single scan instead of a substring test apiece; tuple order keeps the old
+# priority (opens > reminders > weather > news)
+COMMANDS=(("open youtube",_cmd_youtube),("open brave",_cmd_brave),("open chrome",_cmd_chrome),
+          ("remind me to",_cmd_remind),("what are my reminders",_cmd_remind),
+          ("weather",_cmd_weather),("news",_cmd_news))
+COMMAND_MAP=dict(COMMANDS)
+COMMAND_RE=re.compile("|".join(re.escape(k) for k,_ in COMMANDS))
+
+def handle_command(cmd:str,hud_ref:Optional[QWidget]=None):
+    cmd_norm=cmd.lower().strip()
+    if hud_ref: hud_ref.update_response(f"You said: {cmd_norm}")
+
+    hits=set(COMMAND_RE.findall(cmd_norm))
+    for key,fn in COMMANDS:
+        if key in hits: return fn(cmd_norm,hud_ref)
+
+    # youtube play
+    if cmd_norm.startswith("play "): song=cmd_norm.replace("play","").replace("on youtube","").strip(); speak(f"Playing {song} on YouTube"); play_youtube_song(song); return
+
+    # gemini
+    global CONVERSATION_HISTORY
+    hit=_API_CACHE.get(("gemini",cmd_norm))
+    if hit and hit[0]>time.time(): speak(hit[1]); hud_ref.update_response(hit[1]); return
+    CONVERSATION_HISTORY.append({"role":"user","parts":[{"text":cmd_norm}]})
+    try:
+        # ship only the last 10 turn pairs: full history stays on disk, but the
+        # POST body (and Gemini's prompt-processing time) stops growing per turn
+        r=HTTP_SESSION.post(f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}",json={"contents":CONVERSATION_HISTORY[-20:]},timeout=20)
+        ai_reply=(orjson.loads(r.content) if orjson else r.json())["candidates"][0]["content"]["parts"][0]["text"]
+        CONVERSATION_HISTORY.append({"role":"model","parts":[{"text":ai_reply}]})
+        _API_CACHE[("gemini",cmd_norm)]=(time.time()+300,ai_reply)
+        save_persistent_data(); speak(ai_reply); hud_ref.update_response(ai_reply)
+    except: hud_ref.update_response("Sorry, I couldn't process that.")
+
+# one persistent worker drains the queue: no per-utterance thread spawn, and
+# utterances are handled in the order they were spoken
+_ASR_QUEUE=queue.Queue()
+def _asr_worker():
+    while True:
+        r,a,hud=_ASR_QUEUE.get()
+        try:
+            t=r.recognize_google(a)
+            if t: handle_command(t,hud)
+        except: pass
+threading.Thread(target=_asr_worker,daemon=True).start()
+
+# ---------------- Main ----------------
+def main():
+    app=QApplication(sys.argv); hud=RoseHUD(); hud.show(); sys.exit(app.exec())
+
+if __name__=="__main__": main()